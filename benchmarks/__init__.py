@@ -0,0 +1 @@
+# Benchmark suite package initialization
\ No newline at end of file
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark suite for every route of src.main:app
+
+Drives the ASGI app directly through httpx's ASGI transport (no network, no
+server) against a freshly seeded SQLite file, once with authentication
+enabled and once with it disabled. Reports throughput and p50/p95/p99 per
+route, saves the results as a JSON baseline and fails when a route regresses
+past the threshold.
+
+Usage:
+    python -m benchmarks.run                     # compare against the baseline
+    python -m benchmarks.run --update-baseline   # record a new baseline
+    python -m benchmarks.run --requests 500 --concurrency 20 --threshold 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+AUTH_MODES = ("auth_on", "auth_off")
+BENCH_PASSWORD = "bench-password"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("oz-stack.bench")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+# Benchmark child: runs inside a process whose environment is already set up
+
+def build_scenarios(seed_size: int) -> List[Dict[str, Any]]:
+    """
+    Every route to benchmark. "request" returns the kwargs for client.request
+    given the iteration number; "auth_only" routes are skipped with auth off.
+    """
+    created_ids: List[int] = []
+
+    def bulk_create(i: int) -> Dict[str, Any]:
+        return {"method": "POST", "url": "/api/tasks/bulk",
+                "json": [{"name": f"Bench {i}-{n}"} for n in range(10)]}
+
+    def bulk_update(i: int) -> Dict[str, Any]:
+        ids = [(i * 10 + n) % seed_size + 1 for n in range(10)]
+        return {"method": "PATCH", "url": "/api/tasks/bulk",
+                "json": [{"id": task_id, "status": "In Progress"} for task_id in ids]}
+
+    def bulk_delete(i: int) -> Dict[str, Any]:
+        ids = created_ids[i * 10:(i + 1) * 10]
+        return {"method": "DELETE", "url": "/api/tasks/bulk", "json": {"task_ids": ids}}
+
+    def get(url: str) -> Callable[[int], Dict[str, Any]]:
+        return lambda i: {"method": "GET", "url": url}
+
+    return [
+        {"name": "GET /", "request": get("/")},
+        {"name": "GET /hello", "request": get("/hello?name=Bench")},
+        {"name": "GET /demo", "request": get("/demo")},
+        {"name": "GET /login", "request": get("/login")},
+        {"name": "GET /health", "request": get("/health")},
+        {"name": "GET /api/tasks", "request": get("/api/tasks")},
+        {"name": "GET /api/tasks/html", "request": get("/api/tasks/html")},
+        {"name": "GET /api/random/html", "request": get("/api/random/html")},
+        {"name": "GET /api/tasks/export", "request": get("/api/tasks/export?format=ndjson&status=Pending")},
+        {"name": "POST /api/tasks/bulk", "request": bulk_create, "collect_ids": created_ids},
+        {"name": "PATCH /api/tasks/bulk", "request": bulk_update},
+        {"name": "DELETE /api/tasks/bulk", "request": bulk_delete},
+    ]
+
+
+async def run_scenario(client, scenario: Dict[str, Any], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    """Fire the scenario's requests with bounded concurrency and summarize latencies"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int, record: bool) -> None:
+        nonlocal errors
+        kwargs = scenario["request"](i)
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(**kwargs)
+            await response.aread()
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            errors += 1
+        elif "collect_ids" in scenario:
+            scenario["collect_ids"].extend(task["id"] for task in response.json())
+        if record:
+            latencies.append(elapsed)
+
+    for i in range(warmup):
+        await one(i, record=False)
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(warmup + i, record=True) for i in range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / wall, 1) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run_child(args: argparse.Namespace) -> Dict[str, Any]:
+    """Seed the database, boot the app in-process and benchmark every route"""
+    import httpx
+
+    sys.path.insert(0, str(ROOT_DIR))
+    # Keep the app's own logging (SQL echo, per-request logs) out of the timings
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    from src.main import app
+    from src.database import crud, db, schemas
+
+    db.init_db()
+    session = db.SessionLocal()
+    try:
+        crud.bulk_create_tasks(session, [
+            schemas.TaskCreate(name=f"Seed {i}", status=("Pending", "In Progress", "Completed")[i % 3])
+            for i in range(args.seed)
+        ])
+    finally:
+        session.close()
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        # https, so the Secure auth cookie is sent back
+        async with httpx.AsyncClient(transport=transport, base_url="https://bench") as client:
+            auth_enabled = os.environ["AUTH_DISABLED"] != "True"
+            if auth_enabled:
+                response = await client.post("/login", data={"password": BENCH_PASSWORD})
+                if response.status_code != 303:
+                    raise RuntimeError(f"Benchmark login failed with status {response.status_code}")
+
+            results = {}
+            for scenario in build_scenarios(args.seed):
+                results[scenario["name"]] = await run_scenario(
+                    client, scenario, args.requests, args.concurrency, args.warmup
+                )
+            return results
+    finally:
+        await app.router.shutdown()
+
+
+# Benchmark parent: runs one child per auth mode and compares with the baseline
+
+def run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the benchmark for one auth mode in a fresh interpreter"""
+    with tempfile.TemporaryDirectory(prefix="oz-bench-") as tmp_dir:
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{tmp_dir}/bench.db",
+            "DEBUG": "False",
+            "AUTH_DISABLED": "True" if mode == "auth_off" else "False",
+            "AUTH_PASSWORD": BENCH_PASSWORD,
+            "SECRET_KEY": "benchmark-secret-key",
+            "STATIC_BUILD_DIR": f"{tmp_dir}/static",
+        })
+        command = [
+            sys.executable, "-m", "benchmarks.run", "--child",
+            "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+            "--warmup", str(args.warmup), "--seed", str(args.seed),
+        ]
+        logger.info(f"Running {mode} benchmark...")
+        output = subprocess.run(
+            command, cwd=ROOT_DIR, env=env, check=True, stdout=subprocess.PIPE, text=True
+        ).stdout
+    # The child prints its results as the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List every route whose p95 latency or throughput regressed past the threshold"""
+    regressions = []
+    for mode, routes in results.items():
+        for route, current in routes.items():
+            previous = baseline.get(mode, {}).get(route)
+            if not previous:
+                continue
+            if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                regressions.append(
+                    f"[{mode}] {route}: p95 {previous['p95_ms']:.2f} ms -> {current['p95_ms']:.2f} ms"
+                )
+            if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+                regressions.append(
+                    f"[{mode}] {route}: throughput {previous['throughput_rps']:.0f} -> {current['throughput_rps']:.0f} req/s"
+                )
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    header = f"{'route':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    for mode, routes in results.items():
+        print(f"\n{mode}\n{header}\n{'-' * len(header)}")
+        for route, r in routes.items():
+            print(f"{route:<28}{r['throughput_rps']:>10.1f}{r['p50_ms']:>10.2f}"
+                  f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Benchmark CLI entry point"""
+    parser = argparse.ArgumentParser(description="Oz Stack route benchmarks")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per route")
+    parser.add_argument("--seed", type=int, default=5000, help="Tasks seeded into the database")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed regression as a fraction (0.25 = 25%% slower)")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the baseline")
+    parser.add_argument("--mode", choices=AUTH_MODES, action="append", help="Only run this auth mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        results = asyncio.run(run_child(args))
+        print(json.dumps(results))
+        return 0
+
+    results = {mode: run_mode(mode, args) for mode in (args.mode or AUTH_MODES)}
+    print_report(results)
+
+    errors = [f"[{mode}] {route}" for mode, routes in results.items()
+              for route, r in routes.items() if r["errors"]]
+    if errors:
+        logger.error("Routes returned errors: " + ", ".join(errors))
+        return 1
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        logger.info(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    if regressions:
+        logger.error("Performance regressions beyond %.0f%%:\n  %s", args.threshold * 100, "\n  ".join(regressions))
+        return 1
+    logger.info("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,39 @@
-from fastapi import APIRouter, Request
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
-from typing import List, Dict, Any
+from fastapi import APIRouter, Body, Depends, Form, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
 import random
 
+from .database import async_crud, models, schemas
+from .database.db import AsyncReadSessionLocal, current_query_stats, get_async_db, get_async_read_db
+from .database.search import highlight
+from .export import EXPORT_FORMATS, iter_csv, iter_ndjson
+from .fragment_cache import cached_response
+from .jobs import enqueue_job, get_job
+from .live import EVENT_STREAM_HEADERS, task_event_stream
+from .templating import templates
+
 router = APIRouter(prefix="/api")
-templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
+
+
+def json_response(body: bytes, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Send JSON that is already serialized, e.g. by the TypeAdapters in schemas.
+    The route's response_model still documents it, but isn't applied again.
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+def lift_query_budget() -> None:
+    """
+    Exempt a bulk route from QUERY_BUDGET: its statement count grows with the
+    payload (a few per batch; inserts run one per row on SQLite so RETURNING
+    keeps parameter order). N+1 detection still applies.
+    """
+    stats = current_query_stats()
+    if stats:
+        stats.budget = 0
+
 
 # Sample data for demo purposes
 sample_data = [
@@ -14,19 +42,216 @@ sample_data = [
     {"id": 3, "name": "Task 3", "status": "In Progress"},
 ]
 
-@router.get("/tasks")
-async def get_tasks() -> List[Dict[str, Any]]:
+@router.get("/tasks", response_model=List[Dict[str, Any]])
+async def get_tasks(request: Request):
     """Return a list of sample tasks as JSON"""
-    return sample_data
+    return await cached_response(request, ("tasks", "json"), lambda: ORJSONResponse(sample_data))
 
 @router.get("/tasks/html")
 async def get_tasks_html(request: Request):
     """Return tasks rendered as HTML for HTMX"""
-    return templates.TemplateResponse(
-        "components/tasks.html", 
-        {"request": request, "tasks": sample_data}
+    return await cached_response(
+        request,
+        ("tasks", "components/tasks.html"),
+        lambda: templates.TemplateResponse(
+            "components/tasks.html", 
+            {"request": request, "tasks": sample_data}
+        )
+    )
+
+@router.get("/tasks/live")
+async def live_tasks():
+    """Server-Sent Events stream of the task list and every change to it"""
+    return StreamingResponse(
+        task_event_stream(),
+        media_type="text/event-stream",
+        headers=EVENT_STREAM_HEADERS
     )
 
+@router.get("/tasks/export")
+async def export_tasks(
+    format: str = Query("ndjson", description="Export format: ndjson or csv"),
+    status: Optional[str] = None,
+    is_completed: Optional[bool] = None,
+    name: Optional[str] = None
+):
+    """Stream every matching task as NDJSON or CSV"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    filters = {
+        field: value
+        for field, value in {"status": status, "is_completed": is_completed, "name": name}.items()
+        if value is not None
+    }
+    
+    async def rows():
+        # The session lives as long as the stream, not the request handler
+        async with AsyncReadSessionLocal() as db:
+            async for chunk in async_crud.iter_tasks(db, filters):
+                yield chunk
+    
+    if format == "csv":
+        body = iter_csv(rows(), [column.name for column in models.Task.__table__.columns])
+    else:
+        body = iter_ndjson(rows())
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
+
+@router.get("/tasks/stats", response_model=schemas.TaskStats)
+async def get_task_stats(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Task counts, overall and per status, from the trigger-maintained counters"""
+    async def render():
+        stats = await async_crud.get_task_stats(db)
+        return json_response(stats.model_dump_json().encode())
+    return await cached_response(request, ("task_stats", "json"), render)
+
+@router.get("/tasks/stats/html")
+async def get_task_stats_html(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """Return task counts rendered as HTML for HTMX"""
+    async def render():
+        stats = await async_crud.get_task_stats(db)
+        return templates.TemplateResponse(
+            "components/task_stats.html",
+            {"request": request, "stats": stats}
+        )
+    return await cached_response(request, ("task_stats", "components/task_stats.html"), render)
+
+@router.get("/tasks/search", response_model=List[schemas.TaskSearchResult])
+async def search_tasks(
+    q: str = Query(..., description="Words to search for in task names and descriptions"),
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Full-text search over tasks, best match first"""
+    filters = {"status": status} if status is not None else None
+    results = await async_crud.search_tasks(db, q, limit, filters)
+    hits = schemas.TaskSearchResultList.validate_python([
+        {
+            **{field: getattr(task, field) for field in schemas.TaskResponse.model_fields},
+            "snippet": str(highlight(snippet)),
+            "rank": rank,
+        }
+        for task, snippet, rank in results
+    ])
+    return json_response(schemas.TaskSearchResultList.dump_json(hits))
+
+@router.get("/tasks/search/html")
+async def search_tasks_html(
+    request: Request,
+    q: str = "",
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Return search results rendered as HTML for HTMX live search"""
+    async def render():
+        results = await async_crud.search_tasks(db, q, limit)
+        return templates.TemplateResponse(
+            "components/task_search.html",
+            {
+                "request": request,
+                "query": q,
+                "results": [
+                    {"task": task, "snippet": snippet, "rank": rank}
+                    for task, snippet, rank in results
+                ]
+            }
+        )
+    return await cached_response(request, ("task_search", "components/task_search.html", q, limit), render)
+
+@router.post(
+    "/tasks/bulk",
+    response_model=List[schemas.TaskResponse],
+    status_code=status.HTTP_201_CREATED
+)
+async def bulk_create_tasks(
+    tasks: List[schemas.TaskCreate],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many tasks, committing once per batch"""
+    lift_query_budget()
+    created = await async_crud.bulk_create_tasks(db, tasks)
+    return json_response(schemas.dump_tasks_json(created), status.HTTP_201_CREATED)
+
+@router.patch("/tasks/bulk", response_model=List[schemas.TaskResponse])
+async def bulk_update_tasks(
+    updates: List[schemas.TaskBulkUpdate],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update many tasks by ID, committing once per batch"""
+    lift_query_budget()
+    return json_response(schemas.dump_tasks_json(await async_crud.bulk_update_tasks(db, updates)))
+
+@router.delete("/tasks/bulk")
+async def bulk_delete_tasks(
+    task_ids: List[int] = Body(..., embed=True),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete many tasks by ID, committing once per batch"""
+    lift_query_budget()
+    deleted = await async_crud.bulk_delete_tasks(db, task_ids)
+    return {"deleted": deleted}
+
+@router.get("/tasks/page", response_model=schemas.TaskPage)
+async def get_tasks_page(
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Tasks in creation order, one keyset page at a time"""
+    filters = {"status": status_filter} if status_filter is not None else None
+    try:
+        tasks, next_cursor = await async_crud.get_tasks_page(db, limit, after, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page = schemas.TaskPage.model_validate({"tasks": tasks, "next_cursor": next_cursor}, from_attributes=True)
+    return json_response(page.model_dump_json().encode())
+
+@router.get("/tasks/{task_id}", response_model=schemas.TaskResponse)
+async def get_task(task_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Return one task; the cached JSON is sent as is, without re-validating it"""
+    payload = await async_crud.get_task_json(db, task_id)
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return json_response(payload)
+
+@router.post("/jobs", response_model=schemas.JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(job: schemas.JobCreate, db: AsyncSession = Depends(get_async_db)):
+    """Queue a background job; poll /api/jobs/{id} for its progress"""
+    try:
+        return await enqueue_job(db, job)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/jobs/html")
+async def create_job_html(request: Request, kind: str = Form(...), db: AsyncSession = Depends(get_async_db)):
+    """Queue a background job from an HTMX form and return its status, which keeps polling"""
+    try:
+        job = await enqueue_job(db, schemas.JobCreate(kind=kind))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return templates.TemplateResponse("components/job_status.html", {"request": request, "job": job})
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobResponse)
+async def get_job_status(job_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Current state of a background job"""
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/html")
+async def get_job_status_html(request: Request, job_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """A job's status for HTMX; the fragment polls itself until the job has finished"""
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return templates.TemplateResponse("components/job_status.html", {"request": request, "job": job})
+
 @router.get("/random")
 async def get_random_number():
     """Generate a random number"""
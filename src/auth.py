@@ -1,62 +1,322 @@
 from fastapi import Depends, HTTPException, status, Request, Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.responses import RedirectResponse
-from passlib.context import CryptContext
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import hashlib
+import hmac
+import logging
 import secrets
+import threading
+import time
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+from .metrics import record_timing
+from .secret_key import get_secret_key
 
 load_dotenv()
 
 # Security settings
-SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_hex(32))
+# Shared by every worker process, see secret_key.py
+SECRET_KEY = get_secret_key()
 AUTH_PASSWORD = os.getenv("AUTH_PASSWORD", "admin")
+# bcrypt hash of the password; when set, it is checked instead of AUTH_PASSWORD
+AUTH_PASSWORD_HASH = os.getenv("AUTH_PASSWORD_HASH")
 # Get token expiry and handle potential parsing errors
 try:
     AUTH_TOKEN_EXPIRY = int(os.getenv("AUTH_TOKEN_EXPIRY", "86400"))
 except ValueError:
     # If there's a parsing error, use the default value and log a warning
-    import logging
     logging.warning("Error parsing AUTH_TOKEN_EXPIRY. Using default value of 86400 seconds.")
     AUTH_TOKEN_EXPIRY = 86400
 AUTH_COOKIE_NAME = os.getenv("AUTH_COOKIE_NAME", "oz_stack_auth")
 AUTH_DISABLED = os.getenv("AUTH_DISABLED", "False").lower() == "true"
+# Maximum number of validated tokens kept in memory
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+# Seconds a cached token is trusted before the shared revocation table is
+# checked again; bounds how long a logout takes to reach other workers
+AUTH_REVOCATION_CHECK_INTERVAL = float(os.getenv("AUTH_REVOCATION_CHECK_INTERVAL", "5"))
+# Threads that may run password hashing at once; logins beyond that queue
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+# Password checks running or queued at once, across all clients; logins
+# beyond that are turned away instead of growing the queue without bound
+AUTH_HASH_BACKLOG = int(os.getenv("AUTH_HASH_BACKLOG", str(AUTH_HASH_WORKERS * 8)))
+# Login attempts per client IP: a burst of LOGIN_RATE_BURST, then one every
+# 60 / LOGIN_RATE_PER_MINUTE seconds
+LOGIN_RATE_BURST = int(os.getenv("LOGIN_RATE_BURST", "5"))
+LOGIN_RATE_PER_MINUTE = float(os.getenv("LOGIN_RATE_PER_MINUTE", "10"))
+
+logger = logging.getLogger("oz-stack.auth")
 
 # Security utilities
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBasic()
 serializer = URLSafeTimedSerializer(SECRET_KEY)
 
+# Already-validated tokens (LRU) and tokens revoked by this process, keyed by
+# token digest. Cache values are (expiry, last revocation check), revocation
+# values the expiry, as epoch times, so neither outlives AUTH_TOKEN_EXPIRY.
+# Revocations are also stored in the revoked_tokens table, which every worker
+# consults for its cached tokens at most every AUTH_REVOCATION_CHECK_INTERVAL.
+_token_cache: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+_revoked_tokens: Dict[str, float] = {}
+_token_lock = threading.Lock()
+
+# bcrypt takes ~250 ms of CPU per check; run it here rather than on the
+# event loop, and never on more than AUTH_HASH_WORKERS threads at once
+_hash_executor = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(AUTH_HASH_BACKLOG)
+
+
+class LoginBusy(RuntimeError):
+    """AUTH_HASH_BACKLOG password checks are already running or queued"""
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """
+    The bcrypt CryptContext, created on first use. Loading passlib and its
+    bcrypt backend is only worth it when a hash is actually checked.
+    """
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token bucket: each key may spend `burst` tokens at once, and
+    regains `rate` tokens per second. Keys idle long enough to be full again
+    are forgotten, and at most `max_keys` keys are tracked (LRU).
+    """
+
+    def __init__(self, burst: int, rate: float, max_keys: int = 10000):
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        # key -> (tokens, time of last update)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """
+        Take one token for key. Returns 0 if allowed, otherwise the number
+        of seconds until a token will be available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate if self.rate > 0 else float("inf")
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+login_limiter = TokenBucketLimiter(LOGIN_RATE_BURST, LOGIN_RATE_PER_MINUTE / 60)
+
+
+def check_login_rate(request: Request) -> float:
+    """
+    Count a login attempt against the client's IP.
+    Returns 0 if it may proceed, otherwise the seconds to wait.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    return login_limiter.acquire(client_ip)
+
+
 def verify_password(plain_password: str, stored_hash: Optional[str] = None) -> bool:
     """
     Verify a password against a stored hash or the environment variable password.
     For simplicity, we allow a plain text password in environment variables.
+    Hash checks are slow; from async code use verify_password_async.
     """
-    if stored_hash and pwd_context.verify(plain_password, stored_hash):
+    if stored_hash and pwd_context().verify(plain_password, stored_hash):
         return True
     
-    # For single user mode, just check against the environment variable
-    return plain_password == AUTH_PASSWORD
+    if AUTH_PASSWORD_HASH:
+        return pwd_context().verify(plain_password, AUTH_PASSWORD_HASH)
+    
+    # For single user mode, just check against the environment variable.
+    # Constant-time, so response timing doesn't reveal how much of it matched
+    return hmac.compare_digest(plain_password.encode(), AUTH_PASSWORD.encode())
+
+
+async def verify_password_async(plain_password: str, stored_hash: Optional[str] = None) -> bool:
+    """
+    verify_password, with any hashing done on the bounded hash thread pool.
+    Raises LoginBusy instead of queueing when the backlog is full.
+    """
+    if not (stored_hash or AUTH_PASSWORD_HASH):
+        return verify_password(plain_password)
+    if not _hash_slots.acquire(blocking=False):
+        raise LoginBusy(f"{AUTH_HASH_BACKLOG} password checks are already pending")
+
+    def check() -> bool:
+        # The slot is held until the hash has run, even if the request
+        # waiting for it has gone away
+        try:
+            return verify_password(plain_password, stored_hash)
+        finally:
+            _hash_slots.release()
+
+    try:
+        future = _hash_executor.submit(check)
+    except RuntimeError:
+        # The executor is shutting down; check will never run
+        _hash_slots.release()
+        raise
+    return await asyncio.wrap_future(future)
+
+
+def _new_auth_token() -> str:
+    # The nonce makes every login's token unique so it can be revoked alone
+    return serializer.dumps({"authenticated": True, "nonce": secrets.token_urlsafe(8)})
 
 
 def get_auth_token(password: str) -> Optional[str]:
     """Generate an authentication token if password is correct."""
     if verify_password(password):
-        return serializer.dumps({"authenticated": True})
+        return _new_auth_token()
     return None
 
 
-def validate_auth_token(token: str) -> bool:
-    """Validate an authentication token."""
+async def authenticate(password: str) -> Optional[str]:
+    """Async get_auth_token that keeps password hashing off the event loop."""
+    if await verify_password_async(password):
+        return _new_auth_token()
+    return None
+
+
+def _token_digest(token: str) -> str:
+    """Key used for the token cache and revocation list."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _load_auth_token(token: str) -> Optional[float]:
+    """
+    Verify a token's signature and payload.
+    Returns the epoch time at which it expires, or None if it is invalid.
+    """
     try:
-        data = serializer.loads(token, max_age=AUTH_TOKEN_EXPIRY)
-        return data.get("authenticated", False)
+        data, issued_at = serializer.loads(token, max_age=AUTH_TOKEN_EXPIRY, return_timestamp=True)
     except (SignatureExpired, BadSignature):
+        return None
+    if not data.get("authenticated", False):
+        return None
+    return issued_at.timestamp() + AUTH_TOKEN_EXPIRY
+
+
+def _revoked_elsewhere(digest: str) -> bool:
+    """
+    Whether any worker has stored a revocation of this token.
+    Fails open: if the table can't be read (locked, not migrated yet), the
+    signed, unexpired token is accepted and checked again after
+    AUTH_REVOCATION_CHECK_INTERVAL, rather than logging everyone out.
+    """
+    from sqlalchemy import select
+    from sqlalchemy.exc import SQLAlchemyError
+
+    from .database.db import read_engine
+    from .database.models import RevokedToken
+
+    try:
+        with read_engine.connect() as connection:
+            return connection.execute(
+                select(RevokedToken.digest).where(RevokedToken.digest == digest)
+            ).first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Could not check token revocations, accepting the token: {e}")
         return False
 
 
+def _store_revocation(digest: str, expires_at: float, now: float) -> None:
+    """Share a revocation with the other workers; this process has already applied it"""
+    from sqlalchemy import delete, insert
+    from sqlalchemy.exc import SQLAlchemyError
+
+    from .database.db import engine
+    from .database.models import RevokedToken
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                insert(RevokedToken).prefix_with("OR IGNORE").values(digest=digest, expires_at=expires_at)
+            )
+            # Forget revocations of tokens that have expired anyway
+            connection.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+    except SQLAlchemyError as e:
+        logger.error(f"Could not store a token revocation; other workers still accept the token: {e}")
+
+
+def validate_auth_token(token: str) -> bool:
+    """
+    Validate an authentication token.
+    Valid tokens are cached until they expire, so repeated requests skip
+    the signature check; every AUTH_REVOCATION_CHECK_INTERVAL seconds a
+    cached token is looked up in the shared revocation table instead.
+    Revoked tokens are always rejected.
+    """
+    digest = _token_digest(token)
+    now = time.time()
+    with _token_lock:
+        if digest in _revoked_tokens:
+            return False
+        cached = _token_cache.get(digest)
+        if cached is not None:
+            expires_at, checked_at = cached
+            if expires_at <= now:
+                del _token_cache[digest]
+                return False
+            if now - checked_at < AUTH_REVOCATION_CHECK_INTERVAL:
+                _token_cache.move_to_end(digest)
+                return True
+    
+    if cached is None:
+        expires_at = _load_auth_token(token)
+        if expires_at is None:
+            return False
+    revoked = _revoked_elsewhere(digest)
+    
+    with _token_lock:
+        # The token may have been revoked here while we were verifying it
+        if revoked or digest in _revoked_tokens:
+            _token_cache.pop(digest, None)
+            return False
+        _token_cache[digest] = (expires_at, now)
+        _token_cache.move_to_end(digest)
+        while len(_token_cache) > AUTH_TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return True
+
+
+def revoke_auth_token(token: str) -> None:
+    """
+    Revoke a token server-side so it is rejected until it expires: at once
+    by this process, and by other workers at their next revocation check.
+    """
+    expires_at = _load_auth_token(token)
+    if expires_at is None:
+        return  # Already invalid, nothing to revoke
+    
+    digest = _token_digest(token)
+    now = time.time()
+    with _token_lock:
+        _token_cache.pop(digest, None)
+        _revoked_tokens[digest] = expires_at
+        for key in [key for key, expiry in _revoked_tokens.items() if expiry <= now]:
+            del _revoked_tokens[key]
+    _store_revocation(digest, expires_at, now)
+
+
 def get_current_user(request: Request) -> bool:
     """
     Validate user authentication from cookie.
@@ -69,8 +329,12 @@ def get_current_user(request: Request) -> bool:
     token = request.cookies.get(AUTH_COOKIE_NAME)
     if not token:
         return False
-        
-    return validate_auth_token(token)
+
+    start = time.perf_counter()
+    try:
+        return validate_auth_token(token)
+    finally:
+        record_timing("auth", time.perf_counter() - start)
 
 
 def require_auth(request: Request):
@@ -88,18 +352,23 @@ def require_auth(request: Request):
     return True
 
 
+def set_token_cookie(response: Response, token: str):
+    """Set the authentication cookie to an already issued token."""
+    response.set_cookie(
+        key=AUTH_COOKIE_NAME,
+        value=token,
+        httponly=True,
+        max_age=AUTH_TOKEN_EXPIRY,
+        secure=os.getenv("DEBUG", "True").lower() != "true",  # Secure in production
+        samesite="lax"
+    )
+
+
 def set_auth_cookie(response: Response, password: str) -> bool:
     """Set the authentication cookie if the password is correct."""
     token = get_auth_token(password)
     if token:
-        response.set_cookie(
-            key=AUTH_COOKIE_NAME,
-            value=token,
-            httponly=True,
-            max_age=AUTH_TOKEN_EXPIRY,
-            secure=os.getenv("DEBUG", "True").lower() != "true",  # Secure in production
-            samesite="lax"
-        )
+        set_token_cookie(response, token)
         return True
     return False
 
@@ -1,2 +1,7 @@
 # Database package initialization
-from .db import engine, SessionLocal, Base, get_db
\ No newline at end of file
+from .db import (
+    engine, SessionLocal, Base, get_db,
+    read_engine, ReadSessionLocal, get_read_db,
+    async_engine, AsyncSessionLocal, get_async_db,
+    async_read_engine, AsyncReadSessionLocal, get_async_read_db,
+)
\ No newline at end of file
@@ -0,0 +1,116 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Callable, Optional
+import os
+import time
+
+from . import models
+from .crud import tasks_changed
+
+# Archive tier for completed tasks
+# Completed tasks whose last update is older than TASK_ARCHIVE_AFTER_DAYS are
+# moved from tasks to tasks_archive in small batches, one short transaction
+# each, so the hot table and its indexes only hold work that is still in
+# play. crud.get_tasks(include_archived=True) reads both. The move deletes
+# from tasks, so the search and counter triggers drop archived tasks from
+# search results and task stats.
+#
+# The pages a move frees are returned to the filesystem by PRAGMA
+# incremental_vacuum, a bounded number at a time, rather than by a full
+# VACUUM that holds the write lock for its whole run. That needs
+# auto_vacuum=INCREMENTAL (the production profile sets it), which applies to
+# a new database at once and to an existing one after a single full VACUUM.
+
+# 0 disables archiving
+TASK_ARCHIVE_AFTER_DAYS = float(os.getenv("TASK_ARCHIVE_AFTER_DAYS", "30"))
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", "500"))
+# Pages freed per incremental_vacuum step
+INCREMENTAL_VACUUM_PAGES = int(os.getenv("INCREMENTAL_VACUUM_PAGES", "1000"))
+# Pause between batches and steps so other writers get the lock in between
+STEP_PAUSE_S = 0.01
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+_task_columns = [column.name for column in models.Task.__table__.columns]
+
+
+def _archivable(older_than: datetime):
+    return (
+        models.Task.is_completed.is_(True),
+        models.Task.updated_at < older_than,
+    )
+
+
+def archive_completed_tasks(
+    db: Session,
+    older_than: datetime,
+    batch_size: Optional[int] = None,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Move completed tasks last updated before `older_than` (naive UTC) into
+    tasks_archive, committing every `batch_size` rows (TASK_ARCHIVE_BATCH_SIZE).
+    on_batch(archived so far) is called after each commit.
+    Returns the number of tasks archived. Ids stay unique across both
+    tables because tasks.id is AUTOINCREMENT (migration 0008).
+    """
+    size = batch_size or TASK_ARCHIVE_BATCH_SIZE
+    archived = 0
+    last_id = 0
+    while True:
+        ids = db.scalars(
+            select(models.Task.id)
+            .where(*_archivable(older_than), models.Task.id > last_id)
+            .order_by(models.Task.id)
+            .limit(size)
+        ).all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        # Re-check the policy inside the write transaction, in case a task
+        # was reopened since it was selected
+        moving = (models.Task.id.in_(ids), *_archivable(older_than))
+        # archived_at gets its default, the current time
+        db.execute(
+            insert(models.ArchivedTask).from_select(
+                _task_columns,
+                select(*[models.Task.__table__.c[name] for name in _task_columns]).where(*moving)
+            )
+        )
+        moved = db.scalars(delete(models.Task).where(*moving).returning(models.Task.id)).all()
+        db.commit()
+        tasks_changed(deleted=moved)
+        archived += len(moved)
+        if on_batch:
+            on_batch(archived)
+        time.sleep(STEP_PAUSE_S)
+    return archived
+
+
+def auto_vacuum_mode(connection: Connection) -> str:
+    """The database's auto_vacuum setting: none, full or incremental"""
+    return AUTO_VACUUM_MODES.get(connection.exec_driver_sql("PRAGMA auto_vacuum").scalar(), "none")
+
+
+def incremental_vacuum(connection: Connection, pages: int = INCREMENTAL_VACUUM_PAGES) -> int:
+    """
+    Return every free page to the filesystem, `pages` at a time, each step
+    its own short write. Use an AUTOCOMMIT connection. Returns the number of
+    pages freed; 0 unless auto_vacuum is incremental.
+    """
+    if connection.dialect.name != "sqlite" or auto_vacuum_mode(connection) != "incremental":
+        return 0
+    freed = 0
+    while True:
+        free = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if not free:
+            break
+        step = min(free, pages)
+        # The pragma frees one page per step of the statement, and the
+        # driver's execute() steps it only once; executescript() runs it out
+        connection.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(step)})")
+        freed += step
+        time.sleep(STEP_PAUSE_S)
+    return freed
@@ -0,0 +1,250 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, AsyncIterator, Sequence, Tuple
+from . import models, schemas
+from .crud import (
+    TasksWithArchive,
+    iter_batches,
+    split_task_page,
+    task_bulk_update_statements,
+    task_export_statement,
+    task_filter_conditions,
+    task_json_statement,
+    task_order_by,
+    task_page_statement,
+    task_search_statement,
+    task_stats_from_rows,
+    tasks_changed,
+)
+from .search import fts_query
+from .stats import task_stats_statement
+from .task_cache import load_through, task_cache
+
+# Async CRUD operations for Task model
+# These mirror the functions in crud.py for use with an AsyncSession
+# (see db.get_async_db), so database I/O never blocks the event loop.
+
+async def get_task(db: AsyncSession, task_id: int) -> Optional[models.Task]:
+    """Get a single task by ID"""
+    return await db.get(models.Task, task_id)
+
+
+async def get_task_json(db: AsyncSession, task_id: int) -> Optional[bytes]:
+    """Get a single task as TaskResponse JSON, read through the task cache"""
+    payload = task_cache.get(task_id)
+    if payload is not None:
+        return payload
+    generation = task_cache.generation
+    row = (await db.execute(task_json_statement(task_id))).first()
+    return load_through(task_id, generation, row)
+
+
+async def get_tasks(
+    db: AsyncSession, 
+    skip: int = 0, 
+    limit: int = 100, 
+    filters: Optional[Dict[str, Any]] = None,
+    sort: Optional[str] = None,
+    include_archived: bool = False
+) -> List[models.Task]:
+    """
+    Get a list of tasks with optional pagination and filtering
+    
+    Args:
+        db: Async database session
+        skip: Number of records to skip (for pagination)
+        limit: Maximum number of records to return
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+        sort: Sort key from crud.TASK_SORT_KEYS, "-" prefixed for descending
+            (default: database order)
+        include_archived: Also return archived tasks (read-only)
+    
+    Returns:
+        List of Task objects
+    """
+    entity = TasksWithArchive if include_archived else models.Task
+    stmt = select(entity).where(*task_filter_conditions(filters, entity))
+    if sort:
+        stmt = stmt.order_by(*task_order_by(sort, entity))
+    result = await db.execute(stmt.offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+
+async def count_tasks(
+    db: AsyncSession,
+    filters: Optional[Dict[str, Any]] = None,
+    include_archived: bool = False
+) -> int:
+    """Count the tasks matching the filters, optionally archived ones too"""
+    entity = TasksWithArchive if include_archived else models.Task
+    stmt = select(func.count()).select_from(entity).where(*task_filter_conditions(filters, entity))
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def get_task_stats(db: AsyncSession) -> schemas.TaskStats:
+    """Task counts, overall and per status, from the counters on SQLite"""
+    rows = (await db.execute(task_stats_statement(db.bind.dialect.name))).all()
+    return task_stats_from_rows(rows)
+
+
+async def get_tasks_page(
+    db: AsyncSession,
+    limit: int = 100,
+    after: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> Tuple[List[models.Task], Optional[str]]:
+    """
+    Get a page of tasks using keyset (cursor) pagination
+    
+    Args:
+        db: Async database session
+        limit: Maximum number of records to return
+        after: Cursor returned by the previous page (None for the first page)
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+    
+    Returns:
+        Tuple of (list of Task objects, cursor for the next page or None)
+    """
+    result = await db.execute(task_page_statement(limit, after, filters))
+    return split_task_page(list(result.all()), limit)
+
+
+async def iter_tasks(
+    db: AsyncSession,
+    filters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 1000
+) -> AsyncIterator[List[Any]]:
+    """
+    Stream all matching tasks in chunks using a server-side cursor
+    
+    Args:
+        db: Async database session
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+        chunk_size: Rows fetched from the cursor per chunk
+    
+    Yields:
+        Lists of task rows (with attribute access, e.g. row.name)
+    """
+    result = await db.stream(
+        task_export_statement(filters),
+        execution_options={"yield_per": chunk_size}
+    )
+    async for partition in result.partitions():
+        yield partition
+
+
+async def search_tasks(
+    db: AsyncSession,
+    search: str,
+    limit: int = 20,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Tuple[models.Task, str, float]]:
+    """
+    Full-text search over task names and descriptions (SQLite FTS5, or a
+    substring match on other databases)
+    
+    Args:
+        db: Async database session
+        search: Free text, e.g. "fix login"
+        limit: Maximum number of results to return
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+    
+    Returns:
+        List of (Task, snippet, rank) tuples, best match first
+    """
+    if not fts_query(search):
+        return []
+    result = await db.execute(task_search_statement(search, limit, filters, db.bind.dialect.name))
+    return [tuple(row) for row in result.all()]
+
+
+async def create_task(db: AsyncSession, task: schemas.TaskCreate) -> models.Task:
+    """Create a new task"""
+    db_task = models.Task(**task.model_dump())
+    db.add(db_task)
+    await db.commit()
+    await db.refresh(db_task)
+    tasks_changed(created=[db_task])
+    return db_task
+
+
+async def update_task(db: AsyncSession, task_id: int, task: schemas.TaskUpdate) -> Optional[models.Task]:
+    """Update an existing task"""
+    db_task = await get_task(db, task_id)
+    if db_task:
+        # Only update fields that are provided (not None)
+        update_data = task.model_dump(exclude_unset=True)
+        for key, value in update_data.items():
+            setattr(db_task, key, value)
+        
+        await db.commit()
+        await db.refresh(db_task)
+        tasks_changed(updated=[db_task])
+    return db_task
+
+
+async def delete_task(db: AsyncSession, task_id: int) -> bool:
+    """Delete a task by ID"""
+    stmt = delete(models.Task).where(models.Task.id == task_id).returning(models.Task.id)
+    deleted = (await db.scalars(stmt)).all()
+    await db.commit()
+    if deleted:
+        tasks_changed(deleted=deleted)
+    return bool(deleted)
+
+
+# Bulk operations: one multi-row statement and one commit per batch
+# (see the sync versions in crud.py for details)
+
+async def bulk_create_tasks(
+    db: AsyncSession,
+    tasks: Sequence[schemas.TaskCreate],
+    batch_size: Optional[int] = None
+) -> List[models.Task]:
+    """Create many tasks using multi-row INSERT ... RETURNING"""
+    created = []
+    for batch in iter_batches(tasks, batch_size):
+        result = await db.scalars(
+            insert(models.Task).returning(models.Task, sort_by_parameter_order=True),
+            [task.model_dump() for task in batch]
+        )
+        rows = result.all()
+        await db.commit()
+        tasks_changed(created=rows)
+        created.extend(rows)
+    return created
+
+
+async def bulk_update_tasks(
+    db: AsyncSession,
+    updates: Sequence[schemas.TaskBulkUpdate],
+    batch_size: Optional[int] = None
+) -> List[models.Task]:
+    """Update many tasks using UPDATE ... WHERE id IN (...) RETURNING"""
+    updated = []
+    for batch in iter_batches(updates, batch_size):
+        rows = []
+        for stmt in task_bulk_update_statements(batch):
+            result = await db.scalars(stmt)
+            rows.extend(result.all())
+        await db.commit()
+        tasks_changed(updated=rows)
+        updated.extend(rows)
+    return updated
+
+
+async def bulk_delete_tasks(
+    db: AsyncSession,
+    task_ids: Sequence[int],
+    batch_size: Optional[int] = None
+) -> List[int]:
+    """Delete many tasks using DELETE ... WHERE id IN (...)"""
+    deleted = []
+    for batch in iter_batches(task_ids, batch_size):
+        stmt = delete(models.Task).where(models.Task.id.in_(batch)).returning(models.Task.id)
+        result = await db.scalars(stmt)
+        ids = result.all()
+        await db.commit()
+        tasks_changed(deleted=ids)
+        deleted.extend(ids)
+    return deleted
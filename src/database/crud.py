@@ -1,6 +1,260 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy import String, case, delete, func, insert, select, tuple_, type_coerce, union_all, update
+from sqlalchemy.orm import Session, aliased
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple, TypeVar
+import base64
+import json
+import os
 from . import models, schemas
+from .search import (
+    DESCRIPTION_WEIGHT,
+    NAME_WEIGHT,
+    fts_query,
+    search_words,
+    tasks_fts,
+    tasks_fts_rank,
+    tasks_fts_snippet,
+)
+from .stats import task_stats_statement
+from .task_cache import load_through, task_cache
+from .events import TaskEvent, task_events
+from .version import bump_data_version
+
+# Number of rows written per statement/transaction by the bulk functions
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+
+T = TypeVar("T")
+
+
+def task_filter_conditions(filters: Optional[Dict[str, Any]], entity: Any = models.Task) -> List[Any]:
+    """
+    Turn a filter dictionary into SQLAlchemy conditions for the Task model
+    (or `entity`, e.g. TasksWithArchive). Unknown fields are ignored.
+    Shared by the sync and async CRUD functions.
+    """
+    if not filters:
+        return []
+    return [
+        getattr(entity, field) == value
+        for field, value in filters.items()
+        if hasattr(entity, field)
+    ]
+
+
+# Live and archived tasks together (see archive.py), mapped as Task so the
+# usual filters and sort keys apply. Read-only: archived rows aren't in the
+# tasks table, so changing one of these objects can't be flushed.
+_task_column_names = [column.name for column in models.Task.__table__.columns]
+TasksWithArchive = aliased(
+    models.Task,
+    union_all(
+        select(*[models.Task.__table__.c[name] for name in _task_column_names]),
+        select(*[models.ArchivedTask.__table__.c[name] for name in _task_column_names]),
+    ).subquery("tasks_with_archive"),
+)
+
+
+# Sort keys accepted by get_tasks, and the columns each one orders by. The
+# trailing columns break ties so the order is total (offset paging never
+# skips or repeats a row), and each tuple matches a composite index.
+TASK_SORT_KEYS: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "name": ("name", "id"),
+    "status": ("status", "created_at", "id"),
+    "created_at": ("created_at", "id"),
+}
+
+
+def task_order_by(sort: str, entity: Any = models.Task) -> List[Any]:
+    """
+    ORDER BY clauses for a sort key from TASK_SORT_KEYS, prefixed with "-"
+    for descending order (e.g. "-created_at").
+    Raises ValueError for unknown keys.
+    """
+    descending = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key not in TASK_SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort!r}")
+    columns = [getattr(entity, name) for name in TASK_SORT_KEYS[key]]
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+# created_at as stored in the database. SQLite keeps timestamps as text and
+# server-side defaults (CURRENT_TIMESTAMP) omit microseconds, so cursors compare
+# against the stored text rather than a re-serialized datetime.
+_created_at_key = type_coerce(models.Task.created_at, String)
+
+
+def encode_task_cursor(created_at: Any, task_id: int) -> str:
+    """Build an opaque pagination cursor pointing just past the given row"""
+    raw = json.dumps([str(created_at), task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_task_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_task_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), int(task_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+
+
+def task_page_statement(
+    limit: int,
+    after: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None
+):
+    """
+    Build the keyset pagination query for tasks ordered by (created_at, id).
+    Rows are (Task, stored created_at) and one extra row is selected so
+    callers can tell whether a next page exists.
+    """
+    stmt = select(models.Task, _created_at_key.label("cursor_created_at"))
+    stmt = stmt.where(*task_filter_conditions(filters))
+    if after:
+        stmt = stmt.where(
+            tuple_(_created_at_key, models.Task.id) > tuple_(*decode_task_cursor(after))
+        )
+    return stmt.order_by(models.Task.created_at, models.Task.id).limit(limit + 1)
+
+
+def split_task_page(rows: List[Any], limit: int) -> Tuple[List[models.Task], Optional[str]]:
+    """Trim the look-ahead row from a page and compute its next cursor"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        task, created_at = rows[-1]
+        next_cursor = encode_task_cursor(created_at, task.id)
+    return [task for task, _ in rows], next_cursor
+
+
+def iter_batches(items: Sequence[T], batch_size: Optional[int] = None) -> Iterator[Sequence[T]]:
+    """Split items into consecutive batches of at most batch_size (default BULK_BATCH_SIZE)"""
+    size = batch_size or BULK_BATCH_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def task_export_statement(filters: Optional[Dict[str, Any]] = None):
+    """
+    Build the query used to stream every task. Plain column rows are selected
+    rather than ORM objects, so streaming never fills the identity map.
+    """
+    return (
+        select(*models.Task.__table__.columns)
+        .where(*task_filter_conditions(filters))
+        .order_by(models.Task.id)
+    )
+
+
+def task_search_statement(
+    search: str,
+    limit: int = 20,
+    filters: Optional[Dict[str, Any]] = None,
+    dialect_name: str = "sqlite"
+):
+    """
+    Build the full-text search query over task names and descriptions.
+    Rows are (Task, snippet, rank), best match first (lower rank is better).
+    The FTS5 index is SQLite-only; other databases get a case-insensitive
+    substring match on both columns instead, with the description as the
+    (unmarked) snippet and the name weighted the same way as bm25().
+    """
+    if dialect_name != "sqlite":
+        words = search_words(search)
+        rank = -sum(
+            case((models.Task.name.icontains(word, autoescape=True), NAME_WEIGHT), else_=0.0)
+            + case((models.Task.description.icontains(word, autoescape=True), DESCRIPTION_WEIGHT), else_=0.0)
+            for word in words
+        )
+        return (
+            select(models.Task, models.Task.description.label("snippet"), rank.label("rank"))
+            .where(*(
+                models.Task.name.icontains(word, autoescape=True)
+                | models.Task.description.icontains(word, autoescape=True)
+                for word in words
+            ))
+            .where(*task_filter_conditions(filters))
+            .order_by(rank, models.Task.id)
+            .limit(limit)
+        )
+    return (
+        select(models.Task, tasks_fts_snippet.label("snippet"), tasks_fts_rank.label("rank"))
+        .join(tasks_fts, tasks_fts.c.rowid == models.Task.id)
+        .where(tasks_fts.c.tasks_fts.op("MATCH")(fts_query(search)))
+        .where(*task_filter_conditions(filters))
+        .order_by(tasks_fts_rank)
+        .limit(limit)
+    )
+
+
+def task_bulk_update_statements(updates: Sequence[schemas.TaskBulkUpdate]) -> List[Any]:
+    """
+    Build UPDATE ... WHERE id IN (...) RETURNING statements for a batch of updates.
+    Updates that set the same values are grouped into a single statement, and
+    repeated ids are merged in order so the last value for a field wins.
+    """
+    changes_by_id: Dict[int, Dict[str, Any]] = {}
+    for item in updates:
+        changes_by_id.setdefault(item.id, {}).update(item.model_dump(exclude_unset=True, exclude={"id"}))
+    
+    ids_by_changes: Dict[Tuple, List[int]] = {}
+    for task_id, changes in changes_by_id.items():
+        if changes:
+            ids_by_changes.setdefault(tuple(sorted(changes.items())), []).append(task_id)
+    
+    return [
+        update(models.Task)
+        .where(models.Task.id.in_(ids))
+        .values(**dict(changes))
+        .returning(models.Task)
+        for changes, ids in ids_by_changes.items()
+    ]
+
+
+def task_json_statement(task_id: int):
+    """Columns of one task as a plain row, so a cache miss builds no ORM object"""
+    return select(*models.Task.__table__.columns).where(models.Task.id == task_id)
+
+
+def task_stats_from_rows(rows: Sequence[Any]) -> schemas.TaskStats:
+    """Build TaskStats from (status, total, completed) rows"""
+    total = sum(row[1] for row in rows)
+    completed = sum(row[2] for row in rows)
+    return schemas.TaskStats(
+        total=total,
+        completed=completed,
+        open=total - completed,
+        by_status={status: count for status, count, _ in rows}
+    )
+
+
+def tasks_changed(
+    created: Sequence[models.Task] = (),
+    updated: Sequence[models.Task] = (),
+    deleted: Sequence[int] = ()
+) -> None:
+    """
+    Called after every committed task write (sync and async) with the rows it
+    touched. Drops those tasks from the task cache, marks cached task data
+    stale and notifies live subscribers.
+    The rows must still be loaded (not expired by the commit).
+    """
+    task_cache.invalidate([t.id for t in created] + [t.id for t in updated] + list(deleted))
+    bump_data_version()
+    if not task_events.has_subscribers:
+        return
+    columns = models.Task.__table__.columns
+    task_events.publish(
+        [TaskEvent("created", {c.name: getattr(t, c.name) for c in columns}) for t in created]
+        + [TaskEvent("updated", {c.name: getattr(t, c.name) for c in columns}) for t in updated]
+        + [TaskEvent("deleted", {"id": task_id}) for task_id in deleted]
+    )
+
 
 # CRUD operations for Task model
 
@@ -9,11 +263,28 @@ def get_task(db: Session, task_id: int) -> Optional[models.Task]:
     return db.query(models.Task).filter(models.Task.id == task_id).first()
 
 
+def get_task_json(db: Session, task_id: int) -> Optional[bytes]:
+    """
+    Get a single task serialized as TaskResponse JSON, or None if it doesn't
+    exist. Read-through: served from the task cache (see task_cache.py) and
+    loaded from the database only on a miss. Call it before the session has
+    read anything else, so a miss never caches a row from an older snapshot.
+    """
+    payload = task_cache.get(task_id)
+    if payload is not None:
+        return payload
+    generation = task_cache.generation
+    row = db.execute(task_json_statement(task_id)).first()
+    return load_through(task_id, generation, row)
+
+
 def get_tasks(
     db: Session, 
     skip: int = 0, 
     limit: int = 100, 
-    filters: Optional[Dict[str, Any]] = None
+    filters: Optional[Dict[str, Any]] = None,
+    sort: Optional[str] = None,
+    include_archived: bool = False
 ) -> List[models.Task]:
     """
     Get a list of tasks with optional pagination and filtering
@@ -23,52 +294,247 @@ def get_tasks(
         skip: Number of records to skip (for pagination)
         limit: Maximum number of records to return
         filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+        sort: Sort key from TASK_SORT_KEYS, "-" prefixed for descending
+            (default: database order)
+        include_archived: Also return archived tasks (read-only; slower,
+            since the two tables are sorted together)
     
     Returns:
         List of Task objects
     """
-    query = db.query(models.Task)
+    entity = TasksWithArchive if include_archived else models.Task
+    query = db.query(entity)
     
     # Apply filters if provided
-    if filters:
-        for field, value in filters.items():
-            if hasattr(models.Task, field):
-                query = query.filter(getattr(models.Task, field) == value)
+    query = query.filter(*task_filter_conditions(filters, entity))
+    if sort:
+        query = query.order_by(*task_order_by(sort, entity))
     
     return query.offset(skip).limit(limit).all()
 
 
+def count_tasks(db: Session, filters: Optional[Dict[str, Any]] = None, include_archived: bool = False) -> int:
+    """Count the tasks matching the filters, optionally archived ones too"""
+    entity = TasksWithArchive if include_archived else models.Task
+    stmt = select(func.count()).select_from(entity).where(*task_filter_conditions(filters, entity))
+    return db.execute(stmt).scalar_one()
+
+
+def get_task_stats(db: Session) -> schemas.TaskStats:
+    """
+    Task counts, overall and per status. On SQLite this reads the
+    trigger-maintained counters (see stats.py), so its cost doesn't grow
+    with the number of tasks.
+    """
+    rows = db.execute(task_stats_statement(db.bind.dialect.name)).all()
+    return task_stats_from_rows(rows)
+
+
+def get_tasks_page(
+    db: Session,
+    limit: int = 100,
+    after: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> Tuple[List[models.Task], Optional[str]]:
+    """
+    Get a page of tasks using keyset (cursor) pagination
+    
+    Unlike get_tasks, this does not scan and discard skipped rows, so every
+    page costs the same as the first one.
+    
+    Args:
+        db: Database session
+        limit: Maximum number of records to return
+        after: Cursor returned by the previous page (None for the first page)
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+    
+    Returns:
+        Tuple of (list of Task objects, cursor for the next page or None)
+    """
+    rows = db.execute(task_page_statement(limit, after, filters)).all()
+    return split_task_page(list(rows), limit)
+
+
+def iter_tasks(
+    db: Session,
+    filters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 1000
+) -> Iterator[List[Any]]:
+    """
+    Stream all matching tasks in chunks using a server-side cursor
+    
+    Memory use stays flat regardless of table size.
+    
+    Args:
+        db: Database session
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+        chunk_size: Rows fetched from the cursor per chunk
+    
+    Yields:
+        Lists of task rows (with attribute access, e.g. row.name)
+    """
+    result = db.execute(
+        task_export_statement(filters),
+        execution_options={"stream_results": True, "yield_per": chunk_size}
+    )
+    for partition in result.partitions():
+        yield partition
+
+
+def search_tasks(
+    db: Session,
+    search: str,
+    limit: int = 20,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Tuple[models.Task, str, float]]:
+    """
+    Full-text search over task names and descriptions (SQLite FTS5, or a
+    substring match on other databases; see task_search_statement())
+    
+    Every word in the search must match, as a prefix, so it works for live
+    search while the user is still typing.
+    
+    Args:
+        db: Database session
+        search: Free text, e.g. "fix login"
+        limit: Maximum number of results to return
+        filters: Dictionary of filter conditions (e.g. {"status": "Pending"})
+    
+    Returns:
+        List of (Task, snippet, rank) tuples, best match first. Matches in the
+        snippet are wrapped in search.MATCH_START/MATCH_END; render them with
+        search.highlight().
+    """
+    if not fts_query(search):
+        return []
+    rows = db.execute(task_search_statement(search, limit, filters, db.bind.dialect.name)).all()
+    return [tuple(row) for row in rows]
+
+
 def create_task(db: Session, task: schemas.TaskCreate) -> models.Task:
     """Create a new task"""
-    db_task = models.Task(**task.dict())
+    db_task = models.Task(**task.model_dump())
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
+    tasks_changed(created=[db_task])
     return db_task
 
 
 def update_task(db: Session, task_id: int, task: schemas.TaskUpdate) -> Optional[models.Task]:
     """Update an existing task"""
-    db_task = get_task(db, task_id)
+    # db.get reuses the task if this session already loaded it
+    db_task = db.get(models.Task, task_id)
     if db_task:
         # Only update fields that are provided (not None)
-        update_data = task.dict(exclude_unset=True)
+        update_data = task.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_task, key, value)
         
         db.commit()
         db.refresh(db_task)
+        tasks_changed(updated=[db_task])
     return db_task
 
 
 def delete_task(db: Session, task_id: int) -> bool:
     """Delete a task by ID"""
-    db_task = get_task(db, task_id)
-    if db_task:
-        db.delete(db_task)
+    # One DELETE ... RETURNING instead of loading the task first
+    stmt = delete(models.Task).where(models.Task.id == task_id).returning(models.Task.id)
+    deleted = db.scalars(stmt).all()
+    db.commit()
+    if deleted:
+        tasks_changed(deleted=deleted)
+    return bool(deleted)
+
+
+# Bulk operations: one multi-row statement and one commit per batch
+
+def bulk_create_tasks(
+    db: Session,
+    tasks: Sequence[schemas.TaskCreate],
+    batch_size: Optional[int] = None
+) -> List[models.Task]:
+    """
+    Create many tasks using multi-row INSERT ... RETURNING
+    
+    Args:
+        db: Database session
+        tasks: Tasks to create
+        batch_size: Rows per INSERT/commit (defaults to BULK_BATCH_SIZE)
+    
+    Returns:
+        List of created Task objects, in input order
+    """
+    created = []
+    for batch in iter_batches(tasks, batch_size):
+        rows = db.scalars(
+            insert(models.Task).returning(models.Task, sort_by_parameter_order=True),
+            [task.model_dump() for task in batch]
+        ).all()
+        # Detach before commit so the returned rows are not expired and
+        # reloaded one by one on first access
+        for row in rows:
+            db.expunge(row)
+        db.commit()
+        tasks_changed(created=rows)
+        created.extend(rows)
+    return created
+
+
+def bulk_update_tasks(
+    db: Session,
+    updates: Sequence[schemas.TaskBulkUpdate],
+    batch_size: Optional[int] = None
+) -> List[models.Task]:
+    """
+    Update many tasks using UPDATE ... WHERE id IN (...) RETURNING
+    
+    Args:
+        db: Database session
+        updates: Updates to apply, each carrying the target task id
+        batch_size: Updates per commit (defaults to BULK_BATCH_SIZE)
+    
+    Returns:
+        List of updated Task objects (ids that do not exist are skipped)
+    """
+    updated = []
+    for batch in iter_batches(updates, batch_size):
+        rows = []
+        for stmt in task_bulk_update_statements(batch):
+            rows.extend(db.scalars(stmt).all())
+        for row in rows:
+            db.expunge(row)
+        db.commit()
+        tasks_changed(updated=rows)
+        updated.extend(rows)
+    return updated
+
+
+def bulk_delete_tasks(
+    db: Session,
+    task_ids: Sequence[int],
+    batch_size: Optional[int] = None
+) -> List[int]:
+    """
+    Delete many tasks using DELETE ... WHERE id IN (...)
+    
+    Args:
+        db: Database session
+        task_ids: IDs of the tasks to delete
+        batch_size: IDs per DELETE/commit (defaults to BULK_BATCH_SIZE)
+    
+    Returns:
+        List of IDs that were actually deleted
+    """
+    deleted = []
+    for batch in iter_batches(task_ids, batch_size):
+        stmt = delete(models.Task).where(models.Task.id.in_(batch)).returning(models.Task.id)
+        ids = db.scalars(stmt).all()
         db.commit()
-        return True
-    return False
+        tasks_changed(deleted=ids)
+        deleted.extend(ids)
+    return deleted
 
 
 # Add more CRUD functions as needed for your application
\ No newline at end of file
@@ -1,8 +1,17 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Column, MetaData, String, Table, create_engine, event, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
 import os
-from typing import Generator
+import re
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, Iterator, Optional
 from dotenv import load_dotenv
 import logging
 
@@ -14,17 +23,249 @@ logger = logging.getLogger("oz-stack.db")
 
 # Database URL configuration - using SQLite by default
 SQLITE_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+IS_SQLITE = SQLITE_DATABASE_URL.startswith("sqlite")
+DEBUG = os.getenv("DEBUG", "True").lower() == "true"
+SQL_ECHO = os.getenv("SQL_ECHO", "False").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+QUERY_BUDGET_ACTION = os.getenv("QUERY_BUDGET_ACTION", "warn").lower()
 
-# Create SQLAlchemy engine
+# SQLite connection profiles - PRAGMAs applied to every new connection.
+# Select one with SQLITE_PROFILE and override single values with
+# SQLITE_<PRAGMA>, e.g. SQLITE_CACHE_SIZE=-128000.
+SQLITE_PRAGMA_PROFILES: Dict[str, Dict[str, str]] = {
+    "default": {},
+    "production": {
+        # Freed pages can be returned with PRAGMA incremental_vacuum instead of
+        # a blocking VACUUM; only takes effect on a new database or after one
+        # full VACUUM (see archive.py)
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",       # readers no longer block on the writer
+        "synchronous": "NORMAL",     # safe with WAL, far fewer fsyncs
+        "cache_size": "-64000",      # 64 MB page cache per connection
+        "mmap_size": "268435456",    # 256 MB memory-mapped I/O
+        "busy_timeout": "5000",      # wait up to 5s for locks instead of failing
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PRAGMAS = ("auto_vacuum", "journal_mode", "synchronous", "cache_size", "mmap_size", "busy_timeout", "temp_store")
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+
+if SQLITE_PROFILE not in SQLITE_PRAGMA_PROFILES:
+    logger.warning(f"Unknown SQLITE_PROFILE '{SQLITE_PROFILE}'. Using the default profile.")
+    SQLITE_PROFILE = "default"
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """Return the PRAGMAs for the active profile, with env overrides applied"""
+    pragmas = dict(SQLITE_PRAGMA_PROFILES[SQLITE_PROFILE])
+    for name in SQLITE_PRAGMAS:
+        value = os.getenv(f"SQLITE_{name.upper()}")
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+
+# Split read/write pools: a single-connection writer engine plus a separate
+# read-only engine, so reads never queue behind writes. On by default in the
+# production profile; in-memory databases cannot be shared and never split.
+SPLIT_READ_WRITE = (
+    IS_SQLITE
+    and ":memory:" not in SQLITE_DATABASE_URL
+    and os.getenv("DATABASE_SPLIT_READ_WRITE", str(SQLITE_PROFILE == "production")).lower() == "true"
+)
+READ_POOL_SIZE = int(os.getenv("DATABASE_READ_POOL_SIZE", "5"))
+
+
+def _install_sqlite_pragmas(sync_engine: Engine, read_only: bool = False) -> None:
+    """Apply the configured PRAGMAs whenever the engine opens a connection"""
+    pragmas = sqlite_pragmas()
+    if read_only:
+        # journal_mode and auto_vacuum are persistent and set by the writer;
+        # readers just refuse to modify the database
+        pragmas.pop("journal_mode", None)
+        pragmas.pop("auto_vacuum", None)
+        pragmas["query_only"] = "ON"
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _engine_options(read_only: bool = False) -> Dict[str, Any]:
+    """Engine keyword arguments shared by the sync and async engines"""
+    options: Dict[str, Any] = {"echo": SQL_ECHO}
+    if SPLIT_READ_WRITE:
+        if read_only:
+            options.update(pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE)
+        else:
+            # SQLite allows one writer at a time; queue in the pool rather
+            # than on the database lock
+            options.update(pool_size=1, max_overflow=0)
+    return options
+
+
+# Create SQLAlchemy engine (the writer when read/write pools are split)
 engine = create_engine(
     SQLITE_DATABASE_URL, 
-    connect_args={"check_same_thread": False} if SQLITE_DATABASE_URL.startswith("sqlite") else {},
-    echo=os.getenv("DEBUG", "True").lower() == "true"
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **_engine_options()
 )
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite for SQLite)"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+# Async database URL - derived from DATABASE_URL unless set explicitly
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(SQLITE_DATABASE_URL))
+
+# Create async SQLAlchemy engine for use inside async routes
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options())
+
+# Read-only engines - the same engines unless read/write pools are split
+if SPLIT_READ_WRITE:
+    read_engine = create_engine(
+        SQLITE_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **_engine_options(read_only=True)
+    )
+    async_read_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(read_only=True))
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+
+if IS_SQLITE:
+    _install_sqlite_pragmas(engine)
+    _install_sqlite_pragmas(async_engine.sync_engine)
+    if SPLIT_READ_WRITE:
+        _install_sqlite_pragmas(read_engine, read_only=True)
+        _install_sqlite_pragmas(async_read_engine.sync_engine, read_only=True)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Create async session factories. Objects stay usable after commit so they
+# can be serialized without triggering lazy loads outside the event loop.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Query instrumentation
+# Every statement on every engine is timed. Statements slower than
+# SLOW_QUERY_MS are logged with their parameters, and within a tracked unit
+# of work (one request, see QueryTrackingMiddleware in metrics.py) a SELECT repeated N_PLUS_ONE_THRESHOLD
+# times is reported as a likely N+1, and going over QUERY_BUDGET queries is
+# reported too. QUERY_BUDGET_ACTION=raise turns both reports into
+# QueryBudgetExceeded errors (meant for tests); the default only warns.
+# SQL_ECHO=True still logs every statement, like the old echo=DEBUG.
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised instead of a warning when QUERY_BUDGET_ACTION=raise"""
+
+
+class QueryStats:
+    """Queries executed within one unit of work, usually one request"""
+
+    def __init__(self, label: str = "", budget: int = QUERY_BUDGET):
+        self.label = label
+        self.budget = budget
+        self.count = 0
+        self.duration = 0.0
+        # SELECT statement -> times executed
+        self.selects: Dict[str, int] = {}
+
+
+# Stats for the current request; None when nobody is tracking
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(label: str = "", budget: int = QUERY_BUDGET) -> Iterator[QueryStats]:
+    """
+    Count queries (and their time) run in the current context until the
+    block ends; whatever was tracked before is restored afterwards. The
+    yielded object keeps updating while the block runs.
+    """
+    stats = QueryStats(label, budget)
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """
+    The QueryStats being tracked, if any. Set its budget (0 disables it) to
+    allow a heavier unit of work, e.g. in a bulk endpoint.
+    """
+    return _query_stats.get()
+
+
+def _report(message: str) -> None:
+    if QUERY_BUDGET_ACTION == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _check_query_budget(stats: QueryStats, statement: str) -> None:
+    where = f" in {stats.label}" if stats.label else ""
+    if stats.budget and stats.count == stats.budget + 1:
+        _report(f"Query budget of {stats.budget} exceeded{where}")
+    if statement.lstrip()[:6].upper() == "SELECT":
+        repeats = stats.selects.get(statement, 0) + 1
+        stats.selects[statement] = repeats
+        if repeats == N_PLUS_ONE_THRESHOLD:
+            _report(f"Possible N+1{where}: statement ran {repeats} times: {statement}")
+
+
+# Time every statement on every engine (sync, async and read-only alike)
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        # Raises before the statement runs when QUERY_BUDGET_ACTION=raise
+        _check_query_budget(stats, statement)
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.duration += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement} {parameters!r}")
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_cursor_error(exception_context):
+    # after_cursor_execute never runs for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
 # Create a base class for declarative models
 Base = declarative_base()
 
@@ -47,17 +288,123 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+def get_read_db() -> Generator:
+    """
+    Like get_db, but the session uses the read-only engine.
+    Use it for routes that never write.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async dependency function to get a database session for `async def` routes.
+    The session is closed when the route is done.
+    
+    Usage:
+    ```
+    @app.get("/tasks")
+    async def read_tasks(db: AsyncSession = Depends(get_async_db)):
+        return await async_crud.get_tasks(db)
+    ```
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Like get_async_db, but the session uses the read-only engine.
+    Use it for GET routes so they never wait behind writes.
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+# Migration scripts, and alembic's own version table. Both are read directly
+# so a normal boot never has to import Alembic.
+MIGRATIONS_DIR = Path(__file__).parent / "migrations" / "versions"
+_REVISION_RE = re.compile(r"^(revision|down_revision)\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+alembic_version = Table(
+    "alembic_version",
+    MetaData(),
+    Column("version_num", String(32), primary_key=True),
+)
+
+
+def migration_head() -> Optional[str]:
+    """
+    The latest revision in MIGRATIONS_DIR, or None if there isn't exactly one
+    head. Parses the scripts' revision identifiers instead of loading them.
+    """
+    revisions, parents = set(), set()
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        identifiers = dict(_REVISION_RE.findall(path.read_text()))
+        if "revision" in identifiers:
+            revisions.add(identifiers["revision"])
+        if "down_revision" in identifiers:
+            parents.add(identifiers["down_revision"])
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """The revision the database is stamped with, or None if it isn't"""
+    try:
+        return connection.execute(select(alembic_version.c.version_num)).scalar()
+    except DBAPIError:
+        # No alembic_version table; it's cheaper to try than to inspect first
+        connection.rollback()
+        return None
+
+
+# init_db may be called from several threads of one process (the desktop
+# window's worker and an embedded web server); they take turns
+_init_db_lock = threading.Lock()
+
+
 def init_db() -> None:
     """
-    Initialize the database by creating all tables.
-    Should be called once at application startup.
+    Make sure the database schema is current. Should be called once at
+    application startup.
+
+    A database already stamped with the latest migration is left alone, which
+    costs one small query. Otherwise the tables are created; a brand-new
+    database is then stamped with the latest migration so later boots (and
+    `alembic upgrade`) know it is current.
     """
     from . import models  # Import here to avoid circular imports
+    from .search import install_task_search
+    from .stats import install_task_stats
     
-    try:
-        logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {str(e)}")
-        raise
\ No newline at end of file
+    with _init_db_lock:
+        try:
+            head = migration_head()
+            with engine.connect() as connection:
+                current = current_revision(connection)
+                if head and current == head:
+                    logger.info(f"Database schema is at the latest migration ({head})")
+                    return
+                existing_tables = set(inspect(connection).get_table_names())
+            if current:
+                logger.warning(
+                    f"Database is at migration {current}, but the latest is {head}. "
+                    "Run `alembic upgrade head` in src/database."
+                )
+
+            logger.info("Creating database tables...")
+            Base.metadata.create_all(bind=engine)
+            with engine.begin() as connection:
+                # Virtual tables and triggers aren't part of the metadata
+                install_task_search(connection)
+                install_task_stats(connection)
+                # Only a database we built from scratch is known to match the head
+                if head and not current and not existing_tables & set(Base.metadata.tables):
+                    alembic_version.create(connection, checkfirst=True)
+                    connection.execute(alembic_version.insert().values(version_num=head))
+                    logger.info(f"Stamped the new database with migration {head}")
+            logger.info("Database tables created successfully")
+        except Exception as e:
+            logger.error(f"Error creating database tables: {str(e)}")
+            raise
@@ -0,0 +1,126 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import asyncio
+import itertools
+import logging
+import os
+import threading
+
+# Task change notifications
+# crud.tasks_changed() publishes every committed task write here, and each
+# subscriber (one per live SSE client, see src/live.py) receives the changes
+# through its own bounded queue. A subscriber that falls LIVE_QUEUE_SIZE
+# batches behind is dropped instead of buffering without limit; its client
+# reconnects and starts again from a fresh snapshot.
+# With a renderer set (src/live.py sets one), each batch is rendered once,
+# by the publisher, and subscribers all send that same message.
+# Notifications are per process, like the data version in version.py.
+
+logger = logging.getLogger("oz-stack.db")
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+
+
+class TaskEvent(NamedTuple):
+    """One changed task: kind is "created", "updated" or "deleted"."""
+    kind: str
+    task: Dict[str, Any]  # column values; only {"id": ...} for deletions
+
+
+class TaskEventBatch(NamedTuple):
+    """The events of one commit, numbered in publish order"""
+    seq: int
+    events: List[TaskEvent]
+    message: Optional[bytes] = None  # rendered by the hub's renderer, if any
+
+
+class Subscription:
+    """A bounded queue of event batches for one consumer"""
+
+    def __init__(self, hub: "TaskEventHub", loop: asyncio.AbstractEventLoop, max_size: int):
+        self.hub = hub
+        self.loop = loop
+        self.queue: "asyncio.Queue[TaskEventBatch]" = asyncio.Queue(maxsize=max_size)
+        self.dropped = False
+
+    def _offer(self, batch: TaskEventBatch) -> None:
+        # Runs on the subscriber's event loop
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            logger.warning("Dropping a live update subscriber that fell too far behind")
+            self.dropped = True
+            self.hub.unsubscribe(self)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[TaskEventBatch]:
+        """
+        Wait for the next batch. Returns None on timeout.
+        Raises ConnectionAbortedError once the subscriber has been dropped.
+        """
+        if self.dropped:
+            raise ConnectionAbortedError("Subscriber fell behind and was dropped")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class TaskEventHub:
+    """Fan-out of task changes to subscribers on any event loop, from any thread"""
+
+    def __init__(self, max_queue_size: int = LIVE_QUEUE_SIZE):
+        self.max_queue_size = max_queue_size
+        self.renderer: Optional[Callable[[List[TaskEvent]], bytes]] = None
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def set_renderer(self, renderer: Optional[Callable[[List[TaskEvent]], bytes]]) -> None:
+        """Render every published batch once with this, before it is queued"""
+        self.renderer = renderer
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        """Subscribe from a coroutine; batches are delivered on its event loop"""
+        subscription = Subscription(self, asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, events: Sequence[TaskEvent]) -> None:
+        """Queue one commit's events for every subscriber. Never blocks."""
+        if not events:
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            seq = next(self._seq)
+        events = list(events)
+        message = None
+        if self.renderer is not None and subscriptions:
+            try:
+                message = self.renderer(events)
+            except Exception:
+                # Subscribers render it themselves; the write already committed
+                logger.exception("Failed to render live update batch %d", seq)
+        batch = TaskEventBatch(seq, events, message)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, batch)
+            except RuntimeError:
+                # The subscriber's event loop has shut down
+                self.unsubscribe(subscription)
+
+
+task_events = TaskEventHub()
@@ -0,0 +1,30 @@
+"""task keyset pagination indexes
+
+Revision ID: 0002_task_keyset_indexes
+Revises: 0001_initial
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_task_keyset_indexes'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Match ORDER BY created_at, id (optionally filtered by status or
+    # is_completed) so crud.get_tasks_page never scans skipped rows.
+    op.create_index('ix_tasks_created_at_id', 'tasks', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_tasks_status_created_at_id', 'tasks', ['status', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_tasks_is_completed_created_at_id', 'tasks', ['is_completed', 'created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_is_completed_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_status_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
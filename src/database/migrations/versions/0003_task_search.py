@@ -0,0 +1,53 @@
+"""task full-text search
+
+Revision ID: 0003_task_search
+Revises: 0002_task_keyset_indexes
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_task_search'
+down_revision = '0002_task_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # External-content FTS5 index over tasks.name/description, kept in sync
+    # by triggers (see src/database/search.py)
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            name, description,
+            content='tasks', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF name, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    # Index the rows that already exist
+    op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS tasks_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS tasks_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS tasks_fts_ai")
+    op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -0,0 +1,72 @@
+"""task status counters
+
+Revision ID: 0005_task_stats
+Revises: 0004_task_sort_indexes
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_task_stats'
+down_revision = '0004_task_sort_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-status task counts kept exact by triggers (see src/database/stats.py)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS task_status_counts (
+            status TEXT NOT NULL PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_status_counts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_status_counts(status, total, completed)
+            VALUES (COALESCE(new.status, ''), 1, COALESCE(new.is_completed, 0) != 0)
+            ON CONFLICT(status) DO UPDATE SET
+                total = total + 1,
+                completed = completed + excluded.completed;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_status_counts_ad AFTER DELETE ON tasks BEGIN
+            UPDATE task_status_counts SET
+                total = total - 1,
+                completed = completed - (COALESCE(old.is_completed, 0) != 0)
+            WHERE status = COALESCE(old.status, '');
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS task_status_counts_au AFTER UPDATE OF status, is_completed ON tasks BEGIN
+            UPDATE task_status_counts SET
+                total = total - 1,
+                completed = completed - (COALESCE(old.is_completed, 0) != 0)
+            WHERE status = COALESCE(old.status, '');
+            INSERT INTO task_status_counts(status, total, completed)
+            VALUES (COALESCE(new.status, ''), 1, COALESCE(new.is_completed, 0) != 0)
+            ON CONFLICT(status) DO UPDATE SET
+                total = total + 1,
+                completed = completed + excluded.completed;
+        END
+    """)
+    # Count the rows that already exist
+    op.execute("DELETE FROM task_status_counts")
+    op.execute("""
+        INSERT INTO task_status_counts(status, total, completed)
+        SELECT COALESCE(status, ''), COUNT(*), SUM(CASE WHEN is_completed THEN 1 ELSE 0 END)
+        FROM tasks
+        GROUP BY COALESCE(status, '')
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS task_status_counts_au")
+    op.execute("DROP TRIGGER IF EXISTS task_status_counts_ad")
+    op.execute("DROP TRIGGER IF EXISTS task_status_counts_ai")
+    op.execute("DROP TABLE IF EXISTS task_status_counts")
@@ -0,0 +1,41 @@
+"""task archive
+
+Revision ID: 0007_task_archive
+Revises: 0006_jobs
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_task_archive'
+down_revision = '0006_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Completed tasks moved out of `tasks` (see src/database/archive.py).
+    # PRAGMA auto_vacuum can't be changed inside a migration; run the
+    # `vacuum` job once to switch an existing database to INCREMENTAL.
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True,
+    )
+    op.create_index('ix_tasks_archive_created_at_id', 'tasks_archive', ['created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_archive_created_at_id', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
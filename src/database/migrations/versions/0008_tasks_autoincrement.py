@@ -0,0 +1,104 @@
+"""tasks autoincrement ids
+
+Revision ID: 0008_tasks_autoincrement
+Revises: 0007_task_archive
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_tasks_autoincrement'
+down_revision = '0007_task_archive'
+branch_labels = None
+depends_on = None
+
+# Triggers on tasks as of this revision (0003 and 0005); dropping the table
+# drops them, so they are recreated afterwards
+TASK_TRIGGERS = {
+    'tasks_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'tasks_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    'tasks_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF name, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'task_status_counts_ai': """
+        CREATE TRIGGER IF NOT EXISTS task_status_counts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_status_counts(status, total, completed)
+            VALUES (COALESCE(new.status, ''), 1, COALESCE(new.is_completed, 0) != 0)
+            ON CONFLICT(status) DO UPDATE SET
+                total = total + 1,
+                completed = completed + excluded.completed;
+        END
+    """,
+    'task_status_counts_ad': """
+        CREATE TRIGGER IF NOT EXISTS task_status_counts_ad AFTER DELETE ON tasks BEGIN
+            UPDATE task_status_counts SET
+                total = total - 1,
+                completed = completed - (COALESCE(old.is_completed, 0) != 0)
+            WHERE status = COALESCE(old.status, '');
+        END
+    """,
+    'task_status_counts_au': """
+        CREATE TRIGGER IF NOT EXISTS task_status_counts_au AFTER UPDATE OF status, is_completed ON tasks BEGIN
+            UPDATE task_status_counts SET
+                total = total - 1,
+                completed = completed - (COALESCE(old.is_completed, 0) != 0)
+            WHERE status = COALESCE(old.status, '');
+            INSERT INTO task_status_counts(status, total, completed)
+            VALUES (COALESCE(new.status, ''), 1, COALESCE(new.is_completed, 0) != 0)
+            ON CONFLICT(status) DO UPDATE SET
+                total = total + 1,
+                completed = completed + excluded.completed;
+        END
+    """,
+}
+
+
+def _rebuild_tasks(autoincrement):
+    for trigger in TASK_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    # SQLite can't add AUTOINCREMENT in place; copy into a new table. Ids,
+    # and with them the search index rowids, are kept.
+    with op.batch_alter_table(
+        'tasks', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}
+    ):
+        pass
+    for statement in TASK_TRIGGERS.values():
+        op.execute(statement)
+
+
+def upgrade():
+    # With AUTOINCREMENT, SQLite never hands out an id again, not even after
+    # the task holding the highest one was deleted or archived, so ids stay
+    # unique across tasks and tasks_archive (see src/database/archive.py)
+    _rebuild_tasks(True)
+    # Start above every id used so far, archived ones included
+    op.execute("""
+        INSERT INTO sqlite_sequence(name, seq)
+        SELECT 'tasks', 0 WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'tasks')
+    """)
+    op.execute("""
+        UPDATE sqlite_sequence SET seq = MAX(
+            seq,
+            (SELECT COALESCE(MAX(id), 0) FROM tasks),
+            (SELECT COALESCE(MAX(id), 0) FROM tasks_archive)
+        )
+        WHERE name = 'tasks'
+    """)
+
+
+def downgrade():
+    _rebuild_tasks(False)
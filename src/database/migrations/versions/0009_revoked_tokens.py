@@ -0,0 +1,31 @@
+"""revoked auth tokens
+
+Revision ID: 0009_revoked_tokens
+Revises: 0008_tasks_autoincrement
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_revoked_tokens'
+down_revision = '0008_tasks_autoincrement'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Logouts seen by every worker process (see src/auth.py)
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('digest'),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table('revoked_tokens')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .db import Base
@@ -16,10 +16,93 @@ class Task(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    # Composite indexes backing keyset pagination (ORDER BY created_at, id),
+    # optionally narrowed by the most common filters.
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tasks_is_completed_created_at_id", "is_completed", "created_at", "id"),
+        # The remaining crud.TASK_SORT_KEYS orders, alone and by status
+        Index("ix_tasks_name_id", "name", "id"),
+        Index("ix_tasks_status_name_id", "status", "name", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        # Never reuse an id, so archived tasks keep theirs (archive.py)
+        {"sqlite_autoincrement": True},
+    )
+
     def __repr__(self):
         return f"<Task(id={self.id}, name='{self.name}', status='{self.status}')>"
 
 
+class ArchivedTask(Base):
+    """
+    Completed tasks moved out of `tasks` by archive.archive_completed_tasks,
+    with their original ids. Kept lean: one index for reading them in order.
+    """
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(String(50))
+    is_completed = Column(Boolean)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_tasks_archive_created_at_id", "created_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedTask(id={self.id}, name='{self.name}')>"
+
+
+class RevokedToken(Base):
+    """An auth token revoked by /logout, shared by every worker (see auth.py)"""
+    __tablename__ = "revoked_tokens"
+
+    digest = Column(String(64), primary_key=True)  # SHA-256 of the token
+    expires_at = Column(Float, nullable=False)  # Epoch seconds; dropped after this
+
+    def __repr__(self):
+        return f"<RevokedToken(digest='{self.digest[:12]}...')>"
+
+
+class Job(Base):
+    """A unit of background work, run by the worker pool in src/jobs.py"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON arguments for the handler
+    # queued -> running -> succeeded, or back to queued for a retry, or failed
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # Not claimed before this time (UTC); pushed back after a failed attempt
+    run_after = Column(DateTime, nullable=False)
+    # The worker holding the job and until when; an expired lease means the
+    # worker died, and any worker may claim the job again
+    lease_owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    progress = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    result = Column(Text, nullable=True)  # JSON return value of the handler
+    error = Column(Text, nullable=True)  # Last failure, kept across retries
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    # Claiming picks the oldest due job of a status
+    __table_args__ = (
+        Index("ix_jobs_status_run_after_id", "status", "run_after", "id"),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}')>"
+
+
 # Add more models as needed for your application
 # Example:
 """
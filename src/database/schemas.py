@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing import Any, Dict, List, Optional, Sequence
 from datetime import datetime
+import json
 
 # Pydantic schemas for Task model
 class TaskBase(BaseModel):
@@ -23,6 +24,11 @@ class TaskUpdate(BaseModel):
     is_completed: Optional[bool] = None
 
 
+class TaskBulkUpdate(TaskUpdate):
+    """Schema for one item of a bulk Task update"""
+    id: int = Field(..., description="ID of the task to update")
+
+
 class TaskResponse(TaskBase):
     """Schema for Task response"""
     id: int
@@ -30,8 +36,73 @@ class TaskResponse(TaskBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True  # Allow converting ORM objects to response schemas
+    # Allow converting ORM objects to response schemas
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TaskSearchResult(TaskResponse):
+    """Schema for one full-text search hit"""
+    snippet: str = Field(..., description="Matching excerpt, HTML-escaped, with matches in <mark> tags")
+    rank: float = Field(..., description="bm25 relevance score; lower is a better match")
+
+
+class TaskStats(BaseModel):
+    """Schema for task counts, overall and per status"""
+    total: int = Field(..., description="Number of tasks")
+    completed: int = Field(..., description="Tasks with is_completed set")
+    open: int = Field(..., description="Tasks without is_completed set")
+    by_status: Dict[str, int] = Field(..., description="Number of tasks per status ('' for none)")
+
+
+class TaskPage(BaseModel):
+    """Schema for one page of tasks in keyset order"""
+    tasks: List[TaskResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as `after` to get the next page; null on the last page")
+
+
+class JobCreate(BaseModel):
+    """Schema for enqueueing a background job"""
+    kind: str = Field(..., description="Registered job kind, e.g. 'vacuum'")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Keyword arguments for the job handler")
+    max_attempts: int = Field(3, ge=1, le=100, description="Attempts before the job is marked failed")
+    delay: float = Field(0, ge=0, description="Seconds to wait before the job may start")
+
+
+class JobResponse(BaseModel):
+    """Schema for a background job's state"""
+    id: int
+    kind: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    attempts: int
+    max_attempts: int
+    progress: int
+    progress_total: Optional[int] = None
+    result: Any = Field(None, description="The handler's return value once succeeded")
+    error: Optional[str] = Field(None, description="The last failure, while a retry is pending or once failed")
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def parse_result(cls, value: Any) -> Any:
+        # Stored as JSON text in the jobs table
+        return json.loads(value) if isinstance(value, str) else value
+
+
+# Validators/serializers for whole lists, built once at import. Routes that
+# return many tasks serialize them straight to JSON bytes with these rather
+# than going through FastAPI's per-item encoding.
+TaskResponseList = TypeAdapter(List[TaskResponse])
+TaskSearchResultList = TypeAdapter(List[TaskSearchResult])
+
+
+def dump_tasks_json(tasks: Sequence[Any]) -> bytes:
+    """Serialize Task objects (or rows with the same attributes) as a TaskResponse JSON array"""
+    return TaskResponseList.dump_json(TaskResponseList.validate_python(tasks, from_attributes=True))
 
 
 # Add more schemas as needed for your application
\ No newline at end of file
@@ -0,0 +1,104 @@
+from markupsafe import Markup, escape
+from sqlalchemy import column, func, literal_column, table, text
+from sqlalchemy.engine import Connection
+from typing import List, Optional
+import logging
+import re
+
+# Full-text search over tasks.name and tasks.description
+# tasks_fts is an external-content FTS5 table: it stores only the index and
+# reads the text from tasks, and triggers keep it in sync on every write
+# (including the bulk paths, which go through plain INSERT/UPDATE/DELETE).
+# Migration 0003_task_search creates the same objects for Alembic-managed
+# databases; init_db() calls install_task_search() for the rest.
+
+logger = logging.getLogger("oz-stack.db")
+
+TASK_SEARCH_DDL = [
+    # prefix='2 3' indexes 2- and 3-character prefixes so live search
+    # ("ta" -> "task*") stays an index lookup
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        name, description,
+        content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    # Only reindex when the searchable text changes, not on status updates
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF name, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO tasks_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+# Column weights for bm25(): a hit in the name counts ten times a description hit
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# snippet() wraps matches in these; highlight() turns them into <mark> after escaping
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+SNIPPET_TOKENS = 12
+
+tasks_fts = table("tasks_fts", column("rowid"), column("tasks_fts"))
+# bm25() score, lower is better
+tasks_fts_rank = func.bm25(literal_column("tasks_fts"), NAME_WEIGHT, DESCRIPTION_WEIGHT)
+# -1: take the snippet from whichever column matched best
+tasks_fts_snippet = func.snippet(literal_column("tasks_fts"), -1, MATCH_START, MATCH_END, "…", SNIPPET_TOKENS)
+
+
+def install_task_search(connection: Connection) -> bool:
+    """
+    Create the FTS table and its triggers if they are missing, and index the
+    existing rows. Safe to call on every start. Returns True if it created them.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+    ).first()
+    for statement in TASK_SEARCH_DDL:
+        connection.execute(text(statement))
+    if exists:
+        return False
+    rebuild_task_search(connection)
+    logger.info("Created the task search index")
+    return True
+
+
+def rebuild_task_search(connection: Connection) -> None:
+    """Reindex every task, e.g. after rows were written with the triggers dropped"""
+    connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def search_words(search: str) -> List[str]:
+    """The words of a search, without punctuation or FTS5 operators"""
+    return re.findall(r"\w+", search)
+
+
+def fts_query(search: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match, as a
+    prefix, and FTS5 operators and punctuation in the input are ignored.
+    "fix lo" -> '"fix"* "lo"*'
+    """
+    return " ".join(f'"{word}"*' for word in search_words(search))
+
+
+def highlight(snippet: Optional[str]) -> Markup:
+    """HTML-escape a search snippet and mark its matches with <mark>"""
+    escaped = str(escape(snippet or ""))
+    return Markup(escaped.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>"))
+
@@ -0,0 +1,165 @@
+from sqlalchemy import case, column, func, select, table, text
+from sqlalchemy.engine import Connection
+from typing import Any, Dict, List, Tuple
+import logging
+
+# Per-status task counters
+# task_status_counts holds one row per status with the number of tasks and
+# how many of them are completed. Triggers on tasks keep it exact on every
+# insert, delete and status/is_completed change (including the bulk paths),
+# so dashboards read a handful of rows instead of scanning the table.
+# Migration 0005_task_stats creates the same objects for Alembic-managed
+# databases; init_db() calls install_task_stats() for the rest.
+# Tasks without a status are counted under ''.
+
+logger = logging.getLogger("oz-stack.db")
+
+TASK_STATS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS task_status_counts (
+        status TEXT NOT NULL PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_status_counts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO task_status_counts(status, total, completed)
+        VALUES (COALESCE(new.status, ''), 1, COALESCE(new.is_completed, 0) != 0)
+        ON CONFLICT(status) DO UPDATE SET
+            total = total + 1,
+            completed = completed + excluded.completed;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_status_counts_ad AFTER DELETE ON tasks BEGIN
+        UPDATE task_status_counts SET
+            total = total - 1,
+            completed = completed - (COALESCE(old.is_completed, 0) != 0)
+        WHERE status = COALESCE(old.status, '');
+    END
+    """,
+    # Only when a counted column changes, not on name/description edits
+    """
+    CREATE TRIGGER IF NOT EXISTS task_status_counts_au AFTER UPDATE OF status, is_completed ON tasks BEGIN
+        UPDATE task_status_counts SET
+            total = total - 1,
+            completed = completed - (COALESCE(old.is_completed, 0) != 0)
+        WHERE status = COALESCE(old.status, '');
+        INSERT INTO task_status_counts(status, total, completed)
+        VALUES (COALESCE(new.status, ''), 1, COALESCE(new.is_completed, 0) != 0)
+        ON CONFLICT(status) DO UPDATE SET
+            total = total + 1,
+            completed = completed + excluded.completed;
+    END
+    """,
+]
+
+task_status_counts = table(
+    "task_status_counts", column("status"), column("total"), column("completed")
+)
+_tasks = table("tasks", column("status"), column("is_completed"))
+
+# Recount from scratch; the same grouping the triggers maintain
+_recount = (
+    select(
+        func.coalesce(_tasks.c.status, "").label("status"),
+        func.count().label("total"),
+        func.coalesce(func.sum(case((_tasks.c.is_completed, 1), else_=0)), 0).label("completed"),
+    )
+    .group_by(func.coalesce(_tasks.c.status, ""))
+)
+
+# Statuses whose last task went away keep a row with zeros; skip them
+_counters = (
+    select(task_status_counts.c.status, task_status_counts.c.total, task_status_counts.c.completed)
+    .where(task_status_counts.c.total > 0)
+)
+
+
+def task_stats_statement(dialect_name: str):
+    """
+    Query returning (status, total, completed) rows: the counter table on
+    SQLite, a GROUP BY over tasks elsewhere (the triggers are SQLite-only).
+    """
+    return _counters if dialect_name == "sqlite" else _recount
+
+
+def install_task_stats(connection: Connection) -> bool:
+    """
+    Create the counter table and its triggers if they are missing, and count
+    the existing rows. Safe to call on every start. Returns True if it created them.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_status_counts'")
+    ).first()
+    for statement in TASK_STATS_DDL:
+        connection.execute(text(statement))
+    if exists:
+        return False
+    rebuild_task_stats(connection)
+    logger.info("Created the task status counters")
+    return True
+
+
+def rebuild_task_stats(connection: Connection) -> List[Tuple[str, int, int]]:
+    """
+    Recount every status from the tasks table and replace the counters.
+    Run it in one transaction (engine.begin()) so no write slips in between.
+    Returns the new (status, total, completed) rows.
+    """
+    rows = [tuple(row) for row in connection.execute(_recount).all()]
+    connection.execute(task_status_counts.delete())
+    if rows:
+        connection.execute(
+            task_status_counts.insert(),
+            [{"status": status, "total": total, "completed": completed} for status, total, completed in rows],
+        )
+    return rows
+
+
+def check_task_stats(connection: Connection) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Compare the counters with a fresh recount. Returns the statuses that
+    differ, as {status: ((total, completed) stored, (total, completed) actual)}.
+    """
+    stored = {status: (total, completed) for status, total, completed in connection.execute(_counters)}
+    actual = {status: (total, completed) for status, total, completed in connection.execute(_recount)}
+    return {
+        status: (stored.get(status), actual.get(status))
+        for status in stored.keys() | actual.keys()
+        if stored.get(status) != actual.get(status)
+    }
+
+
+if __name__ == "__main__":
+    # python -m src.database.stats [check|rebuild]
+    import argparse
+    import sys
+
+    from .db import engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Check or rebuild the per-status task counters")
+    parser.add_argument(
+        "command", choices=["check", "rebuild"],
+        help="check: compare the counters with a recount; rebuild: recount and replace them"
+    )
+    args = parser.parse_args()
+
+    if args.command == "check":
+        with engine.connect() as connection:
+            drift = check_task_stats(connection)
+        for status, (stored, actual) in sorted(drift.items()):
+            logger.warning(f"Status {status!r}: counters say {stored}, tasks table has {actual}")
+        if drift:
+            logger.warning("Counters are out of date; run `python -m src.database.stats rebuild`")
+            sys.exit(1)
+        logger.info("Task status counters match the tasks table")
+    else:
+        with engine.begin() as connection:
+            install_task_stats(connection)
+            rows = rebuild_task_stats(connection)
+        logger.info(f"Rebuilt task status counters: {sum(total for _, total, _ in rows)} tasks in {len(rows)} statuses")
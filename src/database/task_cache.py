@@ -0,0 +1,199 @@
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Protocol, Tuple, runtime_checkable
+import logging
+import math
+import os
+import threading
+import time
+
+from . import schemas
+
+# Read-through cache of single tasks
+# crud.get_task_json() / async_crud.get_task_json() return a task serialized
+# as TaskResponse JSON, from this cache when possible. crud.tasks_changed()
+# drops the ids touched by every committed write (single and bulk), so the
+# cache never serves a task this process has changed since.
+#
+# The storage is pluggable: anything with the get/set/delete subset of the
+# redis-py client API works as a backend. The default is an in-process LRU
+# with a TTL; with several worker processes each has its own, and the TTL
+# bounds how long a write made by another worker can go unseen. Set
+# TASK_CACHE_URL to a Redis-compatible server to share one cache instead.
+
+logger = logging.getLogger("oz-stack.db")
+
+TASK_CACHE_SIZE = int(os.getenv("TASK_CACHE_SIZE", "10000"))
+TASK_CACHE_TTL = float(os.getenv("TASK_CACHE_TTL", "30"))
+TASK_CACHE_URL = os.getenv("TASK_CACHE_URL", "")
+
+
+@runtime_checkable
+class CacheBackend(Protocol):
+    """
+    Storage interface for TaskCache; the same signatures as redis-py, so a
+    redis.Redis client (or any Redis-compatible stand-in) can be used as is.
+    Subclassing is optional, but a subclass missing a method can't be
+    instantiated.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> Any:
+        """Store value, expiring after `ex` seconds"""
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> int:
+        """Remove keys; returns how many existed"""
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Thread-safe in-process LRU with a per-entry TTL"""
+
+    def __init__(self, max_size: int = TASK_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        if self.max_size <= 0:
+            return False
+        expires_at = time.monotonic() + ex if ex else math.inf
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._entries.pop(key, None) is not None for key in keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TaskCache:
+    """
+    Serialized TaskResponse payloads keyed by task id, with hit/miss counters.
+
+    Loads that raced with a write are not stored: every invalidation bumps a
+    generation, and a value loaded before it is dropped instead of cached.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = TASK_CACHE_TTL, prefix: str = "task:"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def key(self, task_id: int) -> str:
+        return f"{self.prefix}{task_id}"
+
+    def get(self, task_id: int) -> Optional[bytes]:
+        payload = self.backend.get(self.key(task_id))
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return payload
+
+    def set(self, task_id: int, payload: bytes, generation: int) -> bool:
+        """
+        Store a payload loaded after `generation` was read; skipped if a write
+        invalidated anything in the meantime. Returns whether it was stored.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return False
+            # redis-py wants whole seconds
+            self.backend.set(self.key(task_id), payload, ex=max(1, math.ceil(self.ttl)))
+            return True
+
+    def invalidate(self, task_ids: Iterable[int]) -> None:
+        keys = [self.key(task_id) for task_id in task_ids]
+        if not keys:
+            return
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(keys)
+            self.backend.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start (per process), and the entry count for the in-process backend"""
+        lookups = self.hits + self.misses
+        stats: Dict[str, Any] = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["size"] = len(self.backend)
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+def serialize_task(row: Any) -> bytes:
+    """TaskResponse JSON for a Task object or a row of task columns"""
+    return schemas.TaskResponse.model_validate(row, from_attributes=True).model_dump_json().encode()
+
+
+def load_through(task_id: int, generation: int, row: Any) -> Optional[bytes]:
+    """Serialize a freshly loaded row (None if the task doesn't exist) and cache it"""
+    if row is None:
+        return None
+    payload = serialize_task(row)
+    task_cache.set(task_id, payload, generation)
+    return payload
+
+
+def create_backend(url: str = TASK_CACHE_URL) -> CacheBackend:
+    """The in-process backend, or a Redis client when a redis:// URL is configured"""
+    if not url:
+        return MemoryCacheBackend()
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("TASK_CACHE_URL is set but the redis package is not installed") from e
+    logger.info("Using a shared task cache (TASK_CACHE_URL)")
+    return redis.Redis.from_url(url)
+
+
+task_cache = TaskCache(create_backend())
+
+
+def set_task_cache_backend(backend: CacheBackend) -> None:
+    """Swap the storage, e.g. for a shared cache created by the application"""
+    if not isinstance(backend, CacheBackend):
+        raise TypeError(f"{type(backend).__name__} lacks the get/set/delete cache backend methods")
+    with task_cache._lock:
+        task_cache.backend = backend
+        # Loads in flight were meant for the old backend
+        task_cache.generation += 1
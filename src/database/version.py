@@ -0,0 +1,22 @@
+import threading
+
+# Data version counter
+# Bumped by every task write in crud.py / async_crud.py so caches of rendered
+# task data (see src/fragment_cache.py) know when they are stale. The counter
+# is per-process; caches bound cross-process staleness with a TTL.
+
+_data_version = 0
+_version_lock = threading.Lock()
+
+
+def get_data_version() -> int:
+    """Return the current data version"""
+    return _data_version
+
+
+def bump_data_version() -> int:
+    """Mark cached data as stale and return the new data version"""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
@@ -6,12 +6,15 @@ from dotenv import load_dotenv
 import sys
 from pathlib import Path
 import logging
+import webbrowser
 
 # Add parent directory to path so we can import our own modules
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-# Import database models (only when needed)
-# from src.database import models, crud, db
+# Database access runs on the background worker (see worker.py); the
+# database modules are imported there, on first use
+from src.desktop.task_table import TaskTable
+from src.desktop.worker import BackgroundWorker
 
 # Configure logging
 logging.basicConfig(
@@ -27,26 +30,116 @@ load_dotenv()
 APP_NAME = os.getenv("APP_NAME", "Oz Stack Desktop")
 APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
 
+# Serve the web UI from this process too, on localhost
+DESKTOP_WEB_SERVER = os.getenv("DESKTOP_WEB_SERVER", "False").lower() == "true"
+DESKTOP_WEB_PORT = int(os.getenv("DESKTOP_WEB_PORT", os.getenv("PORT", "8000")))
+
+# Tasks added by "Add Sample Tasks"
+SAMPLE_TASK_COUNT = int(os.getenv("DESKTOP_SAMPLE_TASKS", "10000"))
+SAMPLE_STATUSES = ("Pending", "In Progress", "Completed")
+
 # Set CustomTkinter appearance
 ctk.set_appearance_mode(os.getenv("CTK_APPEARANCE", "System"))  # Options: "System", "Dark", "Light"
 ctk.set_default_color_theme(os.getenv("CTK_THEME", "blue"))    # Options: "blue", "green", "dark-blue"
 
 
+def init_database(job):
+    """Background job: create or check the database schema"""
+    from src.database.db import init_db
+    init_db()
+
+
+def start_web_server(job, web_app=None, port: int = DESKTOP_WEB_PORT):
+    """
+    Background job: serve the FastAPI app on a thread of this process, so it
+    shares the database engine and in-memory caches with the window.
+    Returns the running EmbeddedServer.
+    """
+    from src.server import EmbeddedServer
+
+    if web_app is None:
+        from src.main import app as web_app
+    server = EmbeddedServer(web_app, host="127.0.0.1", port=port)
+    server.start()
+    return server
+
+
+def create_task(job, name: str, description: str, status: str) -> int:
+    """Background job: save a task and return its ID"""
+    from src.database import crud, db, schemas
+
+    session = db.SessionLocal()
+    try:
+        task = crud.create_task(session, schemas.TaskCreate(
+            name=name,
+            description=description,
+            status=status
+        ))
+        return task.id
+    finally:
+        session.close()
+
+
+def create_sample_tasks(job, count: int = SAMPLE_TASK_COUNT) -> int:
+    """
+    Background job: bulk-create `count` sample tasks, committing a batch at a
+    time and reporting progress. Stops after the current batch when cancelled.
+    """
+    from src.database import crud, db, schemas
+
+    session = db.SessionLocal()
+    try:
+        created = 0
+        while created < count:
+            job.check_cancelled()
+            batch = min(crud.BULK_BATCH_SIZE, count - created)
+            crud.bulk_create_tasks(session, [
+                schemas.TaskCreate(
+                    name=f"Sample task {created + n + 1}",
+                    status=SAMPLE_STATUSES[(created + n) % len(SAMPLE_STATUSES)]
+                )
+                for n in range(batch)
+            ])
+            created += batch
+            job.report_progress(created, count)
+        return created
+    finally:
+        session.close()
+
+
 class OzDesktopApp(ctk.CTk):
     """Main desktop application window using CustomTkinter"""
     
-    def __init__(self):
+    def __init__(self, web_app=None):
         super().__init__()
         
         # Configure window
         self.title(f"{APP_NAME} v{APP_VERSION}")
-        self.geometry("800x600")
+        self.geometry("900x800")
         self.minsize(600, 400)
         
+        # Runs all data operations off the UI thread
+        self.worker = BackgroundWorker(self)
+        self.sample_job = None
+        self.web_server = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # Initialize UI
         self.create_menu()
         self.create_widgets()
         
+        self.worker.submit(
+            init_database,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Failed to initialize the database: {e}")
+        )
+        if DESKTOP_WEB_SERVER:
+            # Queued after init_database, so the schema is ready first
+            self.worker.submit(
+                start_web_server, web_app,
+                on_done=self.web_server_started,
+                on_error=lambda e: messagebox.showerror("Web Server Error", str(e))
+            )
+        
         # Log application start
         logger.info(f"Desktop application started: {APP_NAME} v{APP_VERSION}")
 
@@ -56,11 +149,12 @@ class OzDesktopApp(ctk.CTk):
         self.config(menu=self.menu)
         
         # File menu
-        file_menu = tk.Menu(self.menu, tearoff=0)
+        self.file_menu = file_menu = tk.Menu(self.menu, tearoff=0)
         self.menu.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Settings", command=self.open_settings)
+        file_menu.add_command(label="Open Web UI", command=self.open_web_ui, state="disabled")
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         
         # Help menu
         help_menu = tk.Menu(self.menu, tearoff=0)
@@ -213,12 +307,12 @@ class OzDesktopApp(ctk.CTk):
             button_frame = ctk.CTkFrame(self.data_frame)
             button_frame.pack(fill="x", padx=20, pady=(10, 20))
             
-            save_button = ctk.CTkButton(
+            self.save_button = ctk.CTkButton(
                 button_frame, 
                 text="Save", 
                 command=self.save_data
             )
-            save_button.pack(side="right", padx=10)
+            self.save_button.pack(side="right", padx=10)
             
             clear_button = ctk.CTkButton(
                 button_frame, 
@@ -229,11 +323,34 @@ class OzDesktopApp(ctk.CTk):
                 text_color=("gray10", "gray90")
             )
             clear_button.pack(side="right", padx=10)
+            
+            # Sample data generator, with progress and cancel
+            sample_frame = ctk.CTkFrame(self.data_frame, fg_color="transparent")
+            sample_frame.pack(fill="x", padx=20, pady=(0, 10))
+            
+            self.sample_button = ctk.CTkButton(
+                sample_frame, text=f"Add {SAMPLE_TASK_COUNT:,} Sample Tasks", command=self.add_sample_tasks
+            )
+            self.sample_button.pack(side="left")
+            
+            self.cancel_button = ctk.CTkButton(
+                sample_frame, text="Cancel", command=self.cancel_sample_tasks, state="disabled",
+                fg_color="transparent", border_width=2, text_color=("gray10", "gray90")
+            )
+            self.cancel_button.pack(side="left", padx=10)
+            
+            self.sample_progress = ctk.CTkProgressBar(sample_frame)
+            self.sample_progress.pack(side="left", fill="x", expand=True, padx=10)
+            self.sample_progress.set(0)
+            
+            # Every task, loaded page by page as it scrolls into view
+            self.task_table = TaskTable(self.data_frame, self.worker)
+            self.task_table.pack(fill="both", expand=True, padx=20, pady=(0, 10))
         else:
             self.data_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
     def save_data(self):
-        """Save form data to database (demo function)"""
+        """Save form data to the database on the background worker"""
         # Get form data
         name = self.name_entry.get()
         description = self.desc_entry.get("0.0", "end").strip()
@@ -244,25 +361,49 @@ class OzDesktopApp(ctk.CTk):
             messagebox.showwarning("Validation Error", "Name is required")
             return
         
-        # Normally, you would save to the database here
-        # Example:
-        # db = db.SessionLocal()
-        # try:
-        #     new_task = crud.create_task(db, schemas.TaskCreate(
-        #         name=name,
-        #         description=description,
-        #         status=status
-        #     ))
-        #     messagebox.showinfo("Success", f"Task created with ID: {new_task.id}")
-        # except Exception as e:
-        #     messagebox.showerror("Error", f"Failed to save: {str(e)}")
-        # finally:
-        #     db.close()
+        # Disabled until the save finishes, so a double click saves once
+        self.save_button.configure(state="disabled")
+        
+        def saved(task_id):
+            self.save_button.configure(state="normal")
+            self.clear_form()
+            self.task_table.refresh()
+            messagebox.showinfo("Success", f"Task created with ID: {task_id}")
+        
+        def failed(error):
+            self.save_button.configure(state="normal")
+            messagebox.showerror("Error", f"Failed to save: {str(error)}")
         
-        # For now, just show a message
-        messagebox.showinfo("Data Saved", 
-                            f"Name: {name}\nDescription: {description}\nStatus: {status}")
-        self.clear_form()
+        self.worker.submit(create_task, name, description, status, on_done=saved, on_error=failed)
+
+    def add_sample_tasks(self):
+        """Bulk-create sample tasks on the background worker"""
+        if self.sample_job:
+            return
+        self.sample_progress.set(0)
+        self.sample_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.sample_job = self.worker.submit(
+            create_sample_tasks,
+            on_progress=lambda done, total, items: self.sample_progress.set(done / total),
+            on_done=lambda count: self.finish_sample_tasks(),
+            on_error=lambda e: self.finish_sample_tasks(f"Failed to create sample tasks: {e}"),
+            on_cancelled=self.finish_sample_tasks,
+        )
+
+    def cancel_sample_tasks(self):
+        """Stop creating sample tasks after the current batch"""
+        if self.sample_job:
+            self.sample_job.cancel()
+
+    def finish_sample_tasks(self, error=None):
+        self.sample_job = None
+        self.sample_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        # Batches committed before a cancel or error are kept
+        self.task_table.refresh()
+        if error:
+            messagebox.showerror("Error", error)
 
     def clear_form(self):
         """Clear the data entry form"""
@@ -319,6 +460,24 @@ class OzDesktopApp(ctk.CTk):
             "Part of the Oz Stack Starter Kit"
         )
 
+    def web_server_started(self, server):
+        self.web_server = server
+        self.file_menu.entryconfigure("Open Web UI", state="normal")
+
+    def open_web_ui(self):
+        """Open the embedded web server's UI in the default browser"""
+        if self.web_server:
+            webbrowser.open(self.web_server.url)
+
+    def on_close(self):
+        """Stop the background worker and web server, and close the window"""
+        if self.sample_job:
+            self.sample_job.cancel()
+        self.worker.shutdown()
+        if self.web_server:
+            self.web_server.stop()
+        self.destroy()
+
     def change_appearance_mode(self, new_appearance_mode: str):
         """Change the application appearance mode"""
         ctk.set_appearance_mode(new_appearance_mode)
@@ -332,9 +491,12 @@ class OzDesktopApp(ctk.CTk):
         )
 
 
-def run_desktop_app():
-    """Run the desktop application"""
-    app = OzDesktopApp()
+def run_desktop_app(web_app=None):
+    """
+    Run the desktop application. With DESKTOP_WEB_SERVER, `web_app` is the
+    FastAPI app to serve alongside it (default: src.main.app).
+    """
+    app = OzDesktopApp(web_app)
     app.mainloop()
 
 
@@ -43,6 +43,15 @@ def main():
         "--debug", action="store_true", help="Enable debug logging"
     )
     
+    parser.add_argument(
+        "--web", action="store_true",
+        help="Also serve the web UI from this process on localhost"
+    )
+    
+    parser.add_argument(
+        "--port", type=int, help="Port for --web (default: DESKTOP_WEB_PORT, PORT or 8000)"
+    )
+    
     args = parser.parse_args()
     
     if args.debug:
@@ -57,6 +66,10 @@ def main():
     # Set environment variables for CustomTkinter appearance
     os.environ["CTK_APPEARANCE"] = args.theme.capitalize()
     os.environ["CTK_THEME"] = args.color
+    if args.web:
+        os.environ["DESKTOP_WEB_SERVER"] = "True"
+    if args.port:
+        os.environ["DESKTOP_WEB_PORT"] = str(args.port)
     
     # Import and run the desktop app
     try:
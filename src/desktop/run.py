@@ -18,7 +18,12 @@ if __name__ == "__main__":
     
     # Run the main module
     try:
-        from src.main import app_name, app_version
+        # Read the name from the environment rather than importing src.main,
+        # which would load the whole web stack just to print it
+        from dotenv import load_dotenv
+        load_dotenv()
+        app_name = os.getenv("APP_NAME", "Oz Stack Starter Kit")
+        app_version = os.getenv("APP_VERSION", "1.0.0")
         print(f"Starting {app_name} v{app_version} in desktop mode...")
         
         # Import and run the desktop app
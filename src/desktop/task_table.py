@@ -0,0 +1,336 @@
+import customtkinter as ctk
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import os
+
+# Virtualized task table for the desktop Data view
+# Only the rows that fit in the window exist as widgets. Scrolling doesn't
+# move widgets; it changes which task each pooled row shows. Tasks are
+# fetched a page at a time on the background worker (crud.get_tasks with
+# offset, sort and filter), only for the pages around the viewport, and at
+# most TASK_TABLE_CACHED_PAGES pages are kept. Widget count and memory stay
+# the same whether the table holds a hundred tasks or a million.
+
+TASK_TABLE_PAGE_SIZE = int(os.getenv("DESKTOP_PAGE_SIZE", "200"))
+TASK_TABLE_CACHED_PAGES = int(os.getenv("DESKTOP_CACHED_PAGES", "20"))
+ROW_HEIGHT = 28
+WHEEL_ROWS = 3
+
+STATUS_FILTERS = ["All", "Pending", "In Progress", "Completed"]
+# (sort key, heading, width); width 0 takes the remaining space
+COLUMNS = (
+    ("id", "ID", 70),
+    ("name", "Name", 0),
+    ("status", "Status", 110),
+    ("created_at", "Created", 140),
+)
+
+Row = Tuple[Any, ...]
+
+
+def fetch_task_page(
+    job, page: int, page_size: int, sort: str, filters: Optional[Dict[str, Any]], include_archived: bool = False
+) -> List[Row]:
+    """Background job: one page of tasks as display-ready tuples"""
+    from src.database import crud, db
+
+    job.check_cancelled()
+    session = db.ReadSessionLocal()
+    try:
+        tasks = crud.get_tasks(
+            session, skip=page * page_size, limit=page_size, filters=filters, sort=sort,
+            include_archived=include_archived,
+        )
+        return [
+            (
+                str(task.id),
+                task.name,
+                task.status or "",
+                task.created_at.strftime("%Y-%m-%d %H:%M") if task.created_at else "",
+            )
+            for task in tasks
+        ]
+    finally:
+        session.close()
+
+
+def count_task_rows(job, filters: Optional[Dict[str, Any]], include_archived: bool = False) -> int:
+    """Background job: number of tasks matching the filters"""
+    from src.database import crud, db
+
+    session = db.ReadSessionLocal()
+    try:
+        return crud.count_tasks(session, filters, include_archived)
+    finally:
+        session.close()
+
+
+class TaskPageCache:
+    """
+    Pages of the current query, keyed by page number. Keeps the most recently
+    used `max_pages` pages and the jobs fetching the ones still missing.
+    """
+
+    def __init__(self, page_size: int = TASK_TABLE_PAGE_SIZE, max_pages: int = TASK_TABLE_CACHED_PAGES):
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages: "OrderedDict[int, List[Row]]" = OrderedDict()
+        self.loading: Dict[int, Any] = {}
+
+    def row(self, index: int) -> Optional[Row]:
+        """The row at index, or None if its page isn't loaded"""
+        page, offset = divmod(index, self.page_size)
+        rows = self.pages.get(page)
+        if rows is None:
+            return None
+        self.pages.move_to_end(page)
+        return rows[offset] if offset < len(rows) else None
+
+    def missing(self, first_page: int, last_page: int) -> List[int]:
+        """Pages in the range that are neither loaded nor being fetched"""
+        return [
+            page for page in range(first_page, last_page + 1)
+            if page not in self.pages and page not in self.loading
+        ]
+
+    def store(self, page: int, rows: List[Row]) -> None:
+        self.loading.pop(page, None)
+        self.pages[page] = rows
+        self.pages.move_to_end(page)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+
+    def cancel_outside(self, first_page: int, last_page: int) -> None:
+        """Drop fetches for pages the user has already scrolled away from"""
+        for page in [page for page in self.loading if not first_page <= page <= last_page]:
+            self.loading.pop(page).cancel()
+
+    def clear(self) -> None:
+        for job in self.loading.values():
+            job.cancel()
+        self.loading.clear()
+        self.pages.clear()
+
+
+class TaskTable(ctk.CTkFrame):
+    """Scrollable, sortable task table backed by a fixed pool of row widgets"""
+
+    def __init__(self, master, worker, **kwargs):
+        super().__init__(master, **kwargs)
+        self.worker = worker
+        self.sort = "-created_at"
+        self.status_filter = "All"
+        self.include_archived = ctk.BooleanVar(value=False)
+        self.total = 0
+        self.top = 0
+        self.cache = TaskPageCache()
+        # Bumped whenever the query changes, so late results are ignored
+        self.generation = 0
+        # Pooled rows: one label per column, and the texts they show
+        self.rows: List[List[ctk.CTkLabel]] = []
+        self.row_texts: List[Optional[Row]] = []
+        self.visible = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        # Filter and row count
+        toolbar = ctk.CTkFrame(self, fg_color="transparent")
+        toolbar.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        ctk.CTkLabel(toolbar, text="Status:").pack(side="left")
+        self.filter_option = ctk.CTkOptionMenu(toolbar, values=STATUS_FILTERS, command=self.set_status_filter)
+        self.filter_option.pack(side="left", padx=10)
+        # Archived tasks (see database/archive.py) are left out unless asked for
+        ctk.CTkCheckBox(
+            toolbar, text="Archived", variable=self.include_archived, command=self.set_include_archived
+        ).pack(side="left", padx=10)
+        self.count_label = ctk.CTkLabel(toolbar, text="")
+        self.count_label.pack(side="right")
+
+        # Column headings; click to sort, click again to reverse
+        self.header = ctk.CTkFrame(self, fg_color="transparent")
+        self.header.grid(row=1, column=0, sticky="ew")
+        self.header_buttons = {}
+        for column, (key, heading, width) in enumerate(COLUMNS):
+            self._configure_column(self.header, column, width)
+            button = ctk.CTkButton(
+                self.header, text=heading, anchor="w", height=ROW_HEIGHT, corner_radius=0,
+                command=lambda key=key: self.set_sort(key),
+            )
+            button.grid(row=0, column=column, sticky="ew")
+            self.header_buttons[key] = button
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=2, column=0, sticky="nsew")
+        for column, (_, _, width) in enumerate(COLUMNS):
+            self._configure_column(self.body, column, width)
+        self.body.bind("<Configure>", self._on_resize)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=2, column=1, sticky="ns")
+
+        self._bind_wheel(self.body)
+
+        self._update_headings()
+        self.refresh()
+
+    @staticmethod
+    def _configure_column(frame, column: int, width: int) -> None:
+        if width:
+            frame.grid_columnconfigure(column, minsize=width)
+        else:
+            frame.grid_columnconfigure(column, weight=1)
+
+    # Query
+
+    def filters(self) -> Optional[Dict[str, Any]]:
+        return None if self.status_filter == "All" else {"status": self.status_filter}
+
+    def refresh(self) -> None:
+        """Forget every loaded row and count again, e.g. after tasks changed"""
+        self.generation += 1
+        self.cache.clear()
+        generation = self.generation
+        self.worker.submit(
+            count_task_rows, self.filters(), self.include_archived.get(),
+            on_done=lambda total: self._total_loaded(generation, total),
+            on_error=lambda e: self.count_label.configure(text=f"Failed to load tasks: {e}"),
+        )
+        self.render()
+
+    def set_sort(self, key: str) -> None:
+        if self.sort.lstrip("-") == key:
+            self.sort = key if self.sort.startswith("-") else f"-{key}"
+        else:
+            self.sort = key
+        self._update_headings()
+        self.top = 0
+        self.refresh()
+
+    def set_status_filter(self, status: str) -> None:
+        self.status_filter = status
+        self.top = 0
+        self.refresh()
+
+    def set_include_archived(self) -> None:
+        self.top = 0
+        self.refresh()
+
+    def _update_headings(self) -> None:
+        for key, heading, _ in COLUMNS:
+            arrow = ""
+            if self.sort.lstrip("-") == key:
+                arrow = " ▼" if self.sort.startswith("-") else " ▲"
+            self.header_buttons[key].configure(text=heading + arrow)
+
+    def _total_loaded(self, generation: int, total: int) -> None:
+        if generation != self.generation:
+            return
+        self.total = total
+        self.count_label.configure(text=f"{total:,} tasks")
+        self.scroll_to(self.top)
+        self.render()
+
+    def _page_loaded(self, generation: int, page: int, rows: List[Row]) -> None:
+        if generation != self.generation:
+            return
+        self.cache.store(page, rows)
+        first, last = self.top, self.top + self.visible
+        if page * self.cache.page_size < last and (page + 1) * self.cache.page_size > first:
+            self.render()
+
+    def _page_failed(self, generation: int, page: int, error: Exception) -> None:
+        if generation == self.generation:
+            self.cache.loading.pop(page, None)
+            self.count_label.configure(text=f"Failed to load tasks: {error}")
+
+    def _request_pages(self) -> None:
+        """Fetch the visible pages plus one on either side, dropping stale fetches"""
+        if not self.total:
+            return
+        page_size = self.cache.page_size
+        first = max(0, self.top // page_size - 1)
+        last = min((self.total - 1) // page_size, (self.top + self.visible) // page_size + 1)
+        self.cache.cancel_outside(first, last)
+        # Visible pages first
+        visible_first = self.top // page_size
+        pages = sorted(self.cache.missing(first, last), key=lambda page: abs(page - visible_first))
+        generation = self.generation
+        for page in pages:
+            self.cache.loading[page] = self.worker.submit(
+                fetch_task_page, page, page_size, self.sort, self.filters(), self.include_archived.get(),
+                on_done=lambda rows, page=page: self._page_loaded(generation, page, rows),
+                on_error=lambda e, page=page: self._page_failed(generation, page, e),
+            )
+
+    # Rendering
+
+    def _on_resize(self, event) -> None:
+        # event.height is in pixels; widget sizes are scaled with the UI
+        visible = max(1, int(event.height // self._apply_widget_scaling(ROW_HEIGHT)))
+        if visible == self.visible:
+            return
+        # Grow the pool to fit the window; hide (don't destroy) extra rows
+        while len(self.rows) < visible:
+            row = len(self.rows)
+            labels = []
+            for column in range(len(COLUMNS)):
+                label = ctk.CTkLabel(self.body, text="", anchor="w", height=ROW_HEIGHT)
+                label.grid(row=row, column=column, sticky="ew", padx=(5, 0))
+                self._bind_wheel(label)
+                labels.append(label)
+            self.rows.append(labels)
+            self.row_texts.append(None)
+        for row, labels in enumerate(self.rows):
+            for label in labels:
+                if row < visible:
+                    label.grid()
+                else:
+                    label.grid_remove()
+        self.visible = visible
+        self.scroll_to(self.top)
+        self.render()
+
+    def render(self) -> None:
+        """Show the tasks from `top` in the pooled rows, then fetch what's missing"""
+        for offset in range(self.visible):
+            index = self.top + offset
+            if index >= self.total:
+                texts = ("", "", "", "")
+            else:
+                texts = self.cache.row(index) or ("", "Loading...", "", "")
+            # Reconfiguring a label is the expensive part; skip unchanged ones
+            if texts != self.row_texts[offset]:
+                for label, text in zip(self.rows[offset], texts):
+                    label.configure(text=text)
+                self.row_texts[offset] = texts
+        if self.total:
+            self.scrollbar.set(self.top / self.total, min(1.0, (self.top + self.visible) / self.total))
+        else:
+            self.scrollbar.set(0, 1)
+        self._request_pages()
+
+    # Scrolling
+
+    def scroll_to(self, top: int) -> None:
+        top = max(0, min(top, self.total - self.visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def _on_scrollbar(self, action, value, unit=None) -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.total))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_to(self.top + int(float(value)) * step)
+
+    def _bind_wheel(self, widget) -> None:
+        # CTk doesn't allow bind_all, so every part of the table binds it
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_mousewheel)
+
+    def _on_mousewheel(self, event) -> None:
+        # X11 sends buttons 4/5; Windows and macOS send a signed delta
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_to(self.top + (-WHEEL_ROWS if up else WHEEL_ROWS))
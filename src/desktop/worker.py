@@ -0,0 +1,207 @@
+from typing import Any, Callable, List, Optional
+import logging
+import queue
+import threading
+import time
+
+# Background data operations for the desktop app
+# Tk widgets may only be touched from the main thread, and anything slow on
+# that thread (a database query, a network call) freezes the window. Data
+# operations are therefore submitted to a BackgroundWorker: a worker thread
+# takes jobs from a request queue and puts results on a result queue. The
+# main thread drains the result queue from a Tk after() timer, a bounded
+# batch per tick, so the event loop always gets back control within a frame.
+
+logger = logging.getLogger("oz-stack.desktop")
+
+# How often results are drained; ~60 fps
+POLL_INTERVAL_MS = 16
+# Most of a frame that a single drain may spend running UI callbacks
+DRAIN_BUDGET_S = 0.008
+
+_STOP = object()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's function by Job.check_cancelled()"""
+
+
+class Job:
+    """
+    A submitted operation. The function runs on the worker thread and gets
+    the job as its first argument, so long operations can report progress
+    (with partial results) and stop early when cancelled.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_progress: Optional[Callable[[int, Optional[int], List[Any]], None]] = None,
+        on_cancelled: Optional[Callable[[], None]] = None,
+    ):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancelled = on_cancelled
+        self._cancel = threading.Event()
+        # Progress not yet delivered to the UI; coalesced between drains
+        self._progress_lock = threading.Lock()
+        self._progress: Optional[tuple] = None
+        self._pending_items: List[Any] = []
+        # The worker's result queue, set on submit
+        self._results: Optional["queue.Queue[tuple]"] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Ask the job to stop; it finishes at its next check_cancelled()"""
+        self._cancel.set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report_progress(self, done: int, total: Optional[int] = None, items: Optional[List[Any]] = None) -> None:
+        """
+        Called from the job function. Progress reported between two UI drains
+        is merged: the UI sees the latest counts and every item once, so a
+        fast job can't flood the main thread.
+        """
+        with self._progress_lock:
+            first = self._progress is None
+            self._progress = (done, total)
+            if items:
+                self._pending_items.extend(items)
+        if first and self._results is not None:
+            self._results.put(("progress", self, None))
+
+    def take_progress(self) -> Optional[tuple]:
+        """Called on the UI thread: (done, total, items) since the last call"""
+        with self._progress_lock:
+            if self._progress is None:
+                return None
+            done, total = self._progress
+            items, self._pending_items = self._pending_items, []
+            self._progress = None
+            return done, total, items
+
+
+class BackgroundWorker:
+    """
+    Runs jobs on worker threads and delivers their callbacks on the Tk main
+    thread. `widget` is any Tk widget; only its after() method is used.
+    """
+
+    def __init__(self, widget: Any, threads: int = 1):
+        self.widget = widget
+        self._requests: "queue.Queue[Any]" = queue.Queue()
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"desktop-worker-{n}", daemon=True)
+            for n in range(threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._closed = False
+        self._after_id = widget.after(POLL_INTERVAL_MS, self._drain)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **callbacks_and_kwargs: Any) -> Job:
+        """
+        Queue fn(job, *args, **kwargs) for the worker thread. The callback
+        keywords on_done(result), on_error(exception), on_progress(done,
+        total, items) and on_cancelled() are run on the main thread; other
+        keywords are passed to fn.
+        """
+        callbacks = {
+            name: callbacks_and_kwargs.pop(name)
+            for name in ("on_done", "on_error", "on_progress", "on_cancelled")
+            if name in callbacks_and_kwargs
+        }
+        job = Job(fn, args, callbacks_and_kwargs, **callbacks)
+        job._results = self._results
+        self._requests.put(job)
+        return job
+
+    def shutdown(self) -> None:
+        """Stop the worker threads after their current job; pending jobs are dropped"""
+        self._closed = True
+        try:
+            while True:
+                job = self._requests.get_nowait()
+                if isinstance(job, Job):
+                    job.cancel()
+        except queue.Empty:
+            pass
+        for _ in self._threads:
+            self._requests.put(_STOP)
+        try:
+            self.widget.after_cancel(self._after_id)
+        except Exception:
+            pass
+
+    # Worker thread
+
+    def _run(self) -> None:
+        while True:
+            job = self._requests.get()
+            if job is _STOP:
+                return
+            if job.cancelled:
+                self._results.put(("cancelled", job, None))
+                continue
+            try:
+                result = job.fn(job, *job.args, **job.kwargs)
+            except JobCancelled:
+                self._results.put(("cancelled", job, None))
+            except Exception as e:
+                logger.exception(f"Background job {getattr(job.fn, '__name__', job.fn)} failed")
+                self._results.put(("error", job, e))
+            else:
+                self._results.put(("done", job, result))
+
+    # Main thread
+
+    def _drain(self) -> None:
+        """Deliver queued results and progress, within DRAIN_BUDGET_S, then reschedule"""
+        deadline = time.perf_counter() + DRAIN_BUDGET_S
+        progressed = set()
+        while time.perf_counter() < deadline:
+            try:
+                kind, job, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                progressed.add(job)
+                continue
+            # Deliver any progress the job reported before it finished
+            self._deliver_progress(job)
+            progressed.discard(job)
+            callback = {"done": job.on_done, "error": job.on_error, "cancelled": job.on_cancelled}[kind]
+            if callback is None:
+                continue
+            try:
+                callback() if kind == "cancelled" else callback(value)
+            except Exception:
+                logger.exception("Background job callback failed")
+        for job in progressed:
+            self._deliver_progress(job)
+        if not self._closed:
+            self._after_id = self.widget.after(POLL_INTERVAL_MS, self._drain)
+
+    def _deliver_progress(self, job: Job) -> None:
+        progress = job.take_progress()
+        if progress is None or job.on_progress is None:
+            return
+        try:
+            job.on_progress(*progress)
+        except Exception:
+            logger.exception("Background job progress callback failed")
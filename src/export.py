@@ -0,0 +1,47 @@
+from typing import Any, AsyncIterator, Dict, List, Sequence
+from datetime import datetime
+import csv
+import io
+import json
+
+# Streaming encoders for task exports
+# Each takes an async iterator of row chunks (see async_crud.iter_tasks) and
+# yields one encoded chunk at a time, so nothing larger than a chunk is held
+# in memory and the first bytes go out as soon as the first chunk is read.
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert values the json module can't encode"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def iter_ndjson(chunks: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    """Encode rows as newline-delimited JSON, one object per line"""
+    async for rows in chunks:
+        lines = (
+            json.dumps({key: _jsonable(value) for key, value in row._mapping.items()})
+            for row in rows
+        )
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def iter_csv(chunks: AsyncIterator[List[Any]], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in chunks:
+        writer.writerows(tuple(row) for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,117 @@
+from fastapi import Request, Response, status
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, NamedTuple, Optional, Union
+import hashlib
+import inspect
+import os
+import threading
+import time
+
+from .database.version import get_data_version
+
+# Render cache for HTMX fragments and JSON endpoints
+# Responses are cached per (key, data version) and served with a strong ETag,
+# so polling clients get a bodyless 304 while the underlying data is unchanged.
+# The data version is per-process, so entries also expire after a TTL to bound
+# staleness when another worker wrote the data.
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "256"))
+FRAGMENT_CACHE_TTL = float(os.getenv("FRAGMENT_CACHE_TTL", "30"))
+
+# Clients must revalidate every time, which costs them only a 304
+CACHE_CONTROL = "no-cache"
+
+
+class CachedFragment(NamedTuple):
+    """A rendered response body and its validator"""
+    etag: str
+    body: bytes
+    media_type: Optional[str]
+    expires_at: float
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments with a per-entry TTL"""
+
+    def __init__(self, max_size: int = FRAGMENT_CACHE_SIZE, ttl: float = FRAGMENT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CachedFragment]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedFragment]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, etag: str, body: bytes, media_type: Optional[str]) -> CachedFragment:
+        entry = CachedFragment(etag, body, media_type, time.monotonic() + self.ttl)
+        if self.max_size <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+RenderFunc = Callable[[], Union[Response, Awaitable[Response]]]
+
+
+async def cached_response(request: Request, key: Hashable, render: RenderFunc) -> Response:
+    """
+    Serve a response from the fragment cache, rendering it on a miss.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        key: Identifies the template/endpoint and every context value that
+            changes the output, e.g. ("greeting", name)
+        render: Builds the full response; only called on a cache miss.
+            Non-200 responses are returned as-is and never cached.
+
+    Returns:
+        A 304 if the client already has the current body, otherwise the body
+    """
+    cache_key = (key, get_data_version())
+    entry = fragment_cache.get(cache_key)
+    if entry is None:
+        response: Any = render()
+        if inspect.isawaitable(response):
+            response = await response
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        entry = fragment_cache.set(cache_key, make_etag(response.body), response.body, response.media_type)
+
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
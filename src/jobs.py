@@ -0,0 +1,539 @@
+from sqlalchemy import and_, exists, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+
+from .database import crud, models, schemas
+from .database.db import SessionLocal, async_engine, engine
+
+# Background jobs
+# Slow work (bulk imports, reindexing, VACUUM) is enqueued as a row in the
+# jobs table instead of running inside a request. A JobWorkerPool, started by
+# the app's startup hook in every process, claims due jobs with a lease: one
+# UPDATE ... RETURNING marks the job as running and owned by the worker until
+# lease_expires_at, so any number of workers and processes can share the
+# queue. Workers renew the lease while a job runs; if a worker dies, the lease
+# runs out and another worker picks the job up again. Failed attempts are
+# retried with exponential backoff until max_attempts.
+#
+# Handlers declared `async def` run on the event loop; plain functions run
+# in a thread, so blocking work doesn't hold up requests.
+
+logger = logging.getLogger("oz-stack.jobs")
+
+# Jobs run at once by this process; 0 only enqueues (another process runs them)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "30"))
+# How long an idle worker waits before looking for jobs enqueued elsewhere
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# Delay before the first retry; doubled per attempt up to the maximum
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "5"))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "300"))
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT", "10"))
+# Most often a running job's progress is saved
+JOB_HEARTBEAT_INTERVAL = 1.0
+# Seconds between runs of the archive_tasks maintenance job; 0 turns it off
+TASK_MAINTENANCE_INTERVAL = float(os.getenv("TASK_MAINTENANCE_INTERVAL", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+jobs_table = models.Job.__table__
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job at once, without retries"""
+
+
+class JobLeaseLost(RuntimeError):
+    """The job's lease expired and another worker may have claimed it"""
+
+
+class JobContext:
+    """Passed to handlers as their first argument"""
+
+    def __init__(self, job_id: int, attempt: int, owner: str, progress: int = 0, progress_total: Optional[int] = None):
+        self.id = job_id
+        self.attempt = attempt
+        self.owner = owner
+        # Where an earlier attempt got to, if it saved progress
+        self.progress = progress
+        self.progress_total = progress_total
+        self.transactional_progress = False
+
+    def report_progress(self, done: int, total: Optional[int] = None) -> None:
+        """Record progress; the worker saves it about once a second"""
+        self.progress = done
+        if total is not None:
+            self.progress_total = total
+
+    def save_progress(self, db: Session, done: int, total: Optional[int] = None) -> None:
+        """
+        Write progress in the caller's transaction, so it is committed
+        together with the work it describes and a retry can resume exactly
+        from ctx.progress. Raises JobLeaseLost if the job was taken over.
+        """
+        values: Dict[str, Any] = {"progress": done}
+        if total is not None:
+            values["progress_total"] = total
+        result = db.execute(
+            update(jobs_table)
+            .where(jobs_table.c.id == self.id, jobs_table.c.lease_owner == self.owner)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            raise JobLeaseLost(f"Job {self.id} is no longer held by {self.owner}")
+        self.transactional_progress = True
+        self.report_progress(done, total)
+
+
+JobHandler = Callable[..., Any]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a handler for a kind of job. It is called as
+    handler(ctx, **payload) and its return value, which must be
+    JSON-serializable, is stored as the job's result.
+    """
+    def register(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def job_kinds() -> List[str]:
+    return sorted(_handlers)
+
+
+def utcnow() -> datetime:
+    """Naive UTC, like the timestamps SQLite's CURRENT_TIMESTAMP writes"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds before retrying after the given attempt failed, with jitter"""
+    delay = min(JOB_RETRY_MAX_DELAY, JOB_RETRY_DELAY * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# Enqueueing and reading
+
+def _new_job(job: schemas.JobCreate) -> models.Job:
+    if job.kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {job.kind!r} (expected one of {', '.join(job_kinds())})")
+    return models.Job(
+        kind=job.kind,
+        payload=json.dumps(job.payload),
+        status=QUEUED,
+        attempts=0,
+        max_attempts=job.max_attempts,
+        progress=0,
+        run_after=utcnow() + timedelta(seconds=job.delay),
+    )
+
+
+async def enqueue_job(db: AsyncSession, job: schemas.JobCreate) -> models.Job:
+    """
+    Add a job to the queue and wake this process's workers.
+    Raises ValueError for kinds without a handler.
+    """
+    db_job = _new_job(job)
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    job_pool.wake()
+    return db_job
+
+
+def enqueue_job_sync(db: Session, job: schemas.JobCreate) -> models.Job:
+    """enqueue_job for synchronous code, e.g. scripts and the desktop worker"""
+    db_job = _new_job(job)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    job_pool.wake()
+    return db_job
+
+
+async def get_job(db: AsyncSession, job_id: int) -> Optional[models.Job]:
+    return await db.get(models.Job, job_id)
+
+
+def schedule_statement(kind: str, delay: float, exclude_id: Optional[int] = None):
+    """
+    Enqueue a job of `kind` with no arguments, unless one is already queued
+    or running (other than `exclude_id`). A single INSERT ... SELECT WHERE
+    NOT EXISTS, so processes starting together still schedule it only once.
+    """
+    pending = select(jobs_table.c.id).where(
+        jobs_table.c.kind == kind, jobs_table.c.status.in_((QUEUED, RUNNING))
+    )
+    if exclude_id is not None:
+        pending = pending.where(jobs_table.c.id != exclude_id)
+    row = select(
+        literal(kind), literal("{}"), literal(QUEUED), literal(0), literal(1), literal(0),
+        literal(utcnow() + timedelta(seconds=delay)),
+    ).where(~exists(pending))
+    return insert(jobs_table).from_select(
+        ["kind", "payload", "status", "attempts", "max_attempts", "progress", "run_after"], row
+    )
+
+
+async def schedule_job(kind: str, delay: float) -> bool:
+    """Make sure a `kind` job is pending; returns True if this call enqueued it"""
+    async with async_engine.begin() as connection:
+        scheduled = (await connection.execute(schedule_statement(kind, delay))).rowcount > 0
+    if scheduled:
+        job_pool.wake()
+    return scheduled
+
+
+# Queue operations used by the workers; each is one short transaction
+
+def claim_statement(owner: str, now: datetime, lease_seconds: float):
+    """
+    Take the oldest due job: a queued one whose run_after has passed, or a
+    running one whose lease expired. The condition is repeated outside the
+    subquery so that of two workers racing for a job only one gets it.
+    """
+    claimable = or_(
+        and_(jobs_table.c.status == QUEUED, jobs_table.c.run_after <= now),
+        and_(jobs_table.c.status == RUNNING, jobs_table.c.lease_expires_at < now),
+    )
+    next_job = (
+        select(jobs_table.c.id)
+        .where(claimable)
+        .order_by(jobs_table.c.run_after, jobs_table.c.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        update(jobs_table)
+        .where(jobs_table.c.id == next_job, claimable)
+        .values(
+            status=RUNNING,
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=jobs_table.c.attempts + 1,
+            updated_at=now,
+        )
+        .returning(
+            jobs_table.c.id, jobs_table.c.kind, jobs_table.c.payload, jobs_table.c.attempts,
+            jobs_table.c.max_attempts, jobs_table.c.progress, jobs_table.c.progress_total,
+        )
+    )
+
+
+def _held_by(job_id: int, owner: str):
+    return and_(jobs_table.c.id == job_id, jobs_table.c.lease_owner == owner, jobs_table.c.status == RUNNING)
+
+
+async def claim_job(owner: str, lease_seconds: float = JOB_LEASE_SECONDS):
+    async with async_engine.begin() as connection:
+        return (await connection.execute(claim_statement(owner, utcnow(), lease_seconds))).first()
+
+
+async def renew_lease(owner: str, job_id: int, lease_seconds: float, progress: Optional[tuple] = None) -> bool:
+    """Extend the lease (and save progress); False if the job is no longer ours"""
+    now = utcnow()
+    values: Dict[str, Any] = {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}
+    if progress is not None:
+        values["progress"], values["progress_total"] = progress
+    async with async_engine.begin() as connection:
+        result = await connection.execute(update(jobs_table).where(_held_by(job_id, owner)).values(**values))
+    return result.rowcount > 0
+
+
+async def finish_job(owner: str, job_id: int, **values: Any) -> bool:
+    """Move a job out of running (done, failed or back to queued) and release its lease"""
+    now = utcnow()
+    values.update(lease_owner=None, lease_expires_at=None, updated_at=now)
+    if values.get("status") in FINISHED:
+        values["finished_at"] = now
+    async with async_engine.begin() as connection:
+        result = await connection.execute(update(jobs_table).where(_held_by(job_id, owner)).values(**values))
+    return result.rowcount > 0
+
+
+# Workers
+
+class JobWorkerPool:
+    """`concurrency` asyncio workers that claim and run jobs in this process"""
+
+    def __init__(
+        self,
+        concurrency: int = JOB_WORKERS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        poll_interval: float = JOB_POLL_INTERVAL,
+    ):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        # Identifies this process's workers in lease_owner
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks or self.concurrency <= 0:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.name}-{n}"), name=f"job-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        logger.info(f"Started {self.concurrency} job workers")
+
+    async def stop(self, timeout: float = JOB_SHUTDOWN_TIMEOUT) -> None:
+        """
+        Let running jobs finish for up to `timeout` seconds, then cancel them.
+        A cancelled job is retried once its lease expires. Jobs running in a
+        thread can't be interrupted; they finish before the process exits.
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self.wake()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("Stopped the job workers")
+
+    def wake(self) -> None:
+        """Have idle workers look for jobs now; safe to call from any thread"""
+        if self._loop is None or self._wake is None or self._loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is self._loop:
+                self._wake.set()
+                return
+        except RuntimeError:
+            pass
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _work(self, owner: str) -> None:
+        while not self._stopping:
+            try:
+                job = await claim_job(owner, self.lease_seconds)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+            if job is None:
+                await self._idle()
+                continue
+            await self._run(owner, job)
+
+    async def _run(self, owner: str, job: Any) -> None:
+        ctx = JobContext(job.id, job.attempts, owner, job.progress, job.progress_total)
+        if job.attempts > job.max_attempts:
+            # Claimed again after its lease ran out on the last attempt
+            await finish_job(owner, job.id, status=FAILED, error="The worker stopped responding on every attempt")
+            logger.error(f"Job {job.id} ({job.kind}) failed: its lease expired on every attempt")
+            return
+        handler = _handlers.get(job.kind)
+        heartbeat = asyncio.create_task(self._heartbeat(ctx))
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise JobFailed(f"No handler for job kind {job.kind!r}")
+            payload = json.loads(job.payload)
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(ctx, **payload)
+            else:
+                result = await asyncio.to_thread(handler, ctx, **payload)
+        except asyncio.CancelledError:
+            logger.warning(f"Job {job.id} ({job.kind}) interrupted; it is retried when its lease expires")
+            raise
+        except JobLeaseLost as e:
+            logger.warning(str(e))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, JobFailed) or job.attempts >= job.max_attempts:
+                logger.error(f"Job {job.id} ({job.kind}) failed on attempt {job.attempts}: {error}")
+                await finish_job(owner, job.id, status=FAILED, error=error)
+            else:
+                delay = retry_delay(job.attempts)
+                logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+                await finish_job(
+                    owner, job.id, status=QUEUED, error=error,
+                    run_after=utcnow() + timedelta(seconds=delay),
+                )
+        else:
+            values: Dict[str, Any] = {"status": SUCCEEDED, "result": json.dumps(result, default=str), "error": None}
+            if not ctx.transactional_progress:
+                values.update(progress=ctx.progress, progress_total=ctx.progress_total)
+            if await finish_job(owner, job.id, **values):
+                logger.info(f"Job {job.id} ({job.kind}) succeeded in {time.perf_counter() - started:.2f}s")
+            else:
+                logger.warning(f"Job {job.id} ({job.kind}) finished after losing its lease; result discarded")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, ctx: JobContext) -> None:
+        """Save progress about once a second and renew the lease a third of the way in"""
+        interval = min(JOB_HEARTBEAT_INTERVAL, self.lease_seconds / 3)
+        saved = (ctx.progress, ctx.progress_total)
+        renew_at = time.monotonic() + self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            progress = None if ctx.transactional_progress else (ctx.progress, ctx.progress_total)
+            if (progress is None or progress == saved) and time.monotonic() < renew_at:
+                continue
+            try:
+                held = await renew_lease(ctx.owner, ctx.id, self.lease_seconds, progress)
+            except Exception:
+                logger.exception(f"Renewing the lease of job {ctx.id} failed")
+                continue
+            if not held:
+                logger.warning(f"Job {ctx.id} lost its lease; another worker may run it again")
+                return
+            saved = progress or saved
+            renew_at = time.monotonic() + self.lease_seconds / 3
+
+
+job_pool = JobWorkerPool()
+
+
+# Built-in jobs
+
+@job_handler("vacuum")
+def vacuum_database(ctx: JobContext) -> Dict[str, int]:
+    """
+    Rebuild the database file to return free pages to the filesystem.
+    Writers wait while it runs; readers carry on (WAL).
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        before = connection.exec_driver_sql("PRAGMA page_count").scalar()
+        connection.exec_driver_sql("VACUUM")
+        after = connection.exec_driver_sql("PRAGMA page_count").scalar()
+    return {"pages_before": before, "pages_after": after}
+
+
+@job_handler("rebuild_task_search")
+def rebuild_task_search_index(ctx: JobContext) -> None:
+    from .database.search import rebuild_task_search
+
+    with engine.begin() as connection:
+        rebuild_task_search(connection)
+
+
+@job_handler("rebuild_task_stats")
+def rebuild_task_status_counters(ctx: JobContext) -> Dict[str, int]:
+    from .database.stats import rebuild_task_stats
+
+    with engine.begin() as connection:
+        rows = rebuild_task_stats(connection)
+    return {"tasks": sum(total for _, total, _ in rows), "statuses": len(rows)}
+
+
+@job_handler("archive_tasks")
+def archive_tasks(ctx: JobContext, older_than_days: Optional[float] = None) -> Dict[str, int]:
+    """
+    Move old completed tasks to the archive table, then return the freed
+    pages to the filesystem with incremental vacuum. Also queues its own next
+    run, every TASK_MAINTENANCE_INTERVAL seconds.
+    """
+    from .database.archive import (
+        TASK_ARCHIVE_AFTER_DAYS,
+        archive_completed_tasks,
+        auto_vacuum_mode,
+        incremental_vacuum,
+    )
+
+    if TASK_MAINTENANCE_INTERVAL > 0:
+        with engine.begin() as connection:
+            connection.execute(schedule_statement("archive_tasks", TASK_MAINTENANCE_INTERVAL, exclude_id=ctx.id))
+
+    days = TASK_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    archived = 0
+    if days > 0:
+        db = SessionLocal()
+        try:
+            archived = archive_completed_tasks(db, utcnow() - timedelta(days=days), on_batch=ctx.report_progress)
+        finally:
+            db.close()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if connection.dialect.name == "sqlite" and auto_vacuum_mode(connection) != "incremental":
+            logger.warning(
+                "auto_vacuum is not INCREMENTAL, so archived tasks leave free pages behind; "
+                "set it (the production profile does) and run a `vacuum` job once to convert the database"
+            )
+        pages_freed = incremental_vacuum(connection)
+    if archived or pages_freed:
+        logger.info(f"Archived {archived} completed tasks, freed {pages_freed} pages")
+    return {"archived": archived, "pages_freed": pages_freed}
+
+
+@job_handler("import_tasks")
+def import_tasks(ctx: JobContext, tasks: List[Dict[str, Any]], batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Create tasks in batches. Progress is committed with each batch, so a
+    retry resumes after the last committed batch instead of duplicating it.
+    """
+    try:
+        items = [schemas.TaskCreate(**task) for task in tasks]
+    except ValueError as e:
+        raise JobFailed(f"Invalid task data: {e}") from e
+    done = ctx.progress
+    db = SessionLocal()
+    try:
+        for batch in crud.iter_batches(items[done:], batch_size):
+            ctx.save_progress(db, done + len(batch), len(items))
+            # Commits the batch and the progress together
+            crud.bulk_create_tasks(db, batch, len(batch))
+            done += len(batch)
+    finally:
+        db.close()
+    return {"created": done}
+
+
+if __name__ == "__main__":
+    # python -m src.jobs: a process that only runs jobs
+    import signal
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    async def run_worker_process() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        pool = job_pool if job_pool.concurrency > 0 else JobWorkerPool(concurrency=1)
+        await pool.start()
+        await stop.wait()
+        await pool.stop()
+
+    asyncio.run(run_worker_process())
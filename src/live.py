@@ -0,0 +1,86 @@
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+from typing import AsyncIterator, List
+import os
+
+from .database import async_crud
+from .database.db import AsyncReadSessionLocal
+from .database.events import TaskEvent, TaskEventBatch, task_events
+from .templating import templates
+
+# Live task updates over Server-Sent Events
+# Instead of polling /api/tasks/html, a client opens one /api/tasks/live
+# stream. It first receives a "tasks" event with the current list, then a
+# "task" event per committed write carrying out-of-band swaps for just the
+# tasks that changed. Each batch of changes is rendered once, when it is
+# published, and shared by every client.
+
+LIVE_INITIAL_TASKS = int(os.getenv("LIVE_INITIAL_TASKS", "50"))
+# Comment lines sent while idle so proxies don't close the connection
+LIVE_PING_INTERVAL = float(os.getenv("LIVE_PING_INTERVAL", "15"))
+
+# nginx: don't buffer the stream
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+LIST_ID = "live-task-list"
+ITEM_ID_PREFIX = "live-task-"
+
+
+def sse_message(event: str, data: str) -> bytes:
+    """Format one Server-Sent Event; every non-blank line of data gets its own data: field"""
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() if line.strip()) or "data: \n"
+    return f"event: {event}\n{lines}\n".encode()
+
+
+def render_events(events: List[TaskEvent]) -> bytes:
+    """The "task" event for one commit's changes"""
+    html = templates.env.get_template("components/task_events.html").render(
+        events=events, list_id=LIST_ID, id_prefix=ITEM_ID_PREFIX
+    )
+    return sse_message("task", html)
+
+
+def batch_message(batch: TaskEventBatch) -> bytes:
+    """The message rendered at publish time, or a fresh one if that failed"""
+    return batch.message if batch.message is not None else render_events(batch.events)
+
+
+task_events.set_renderer(render_events)
+
+
+async def task_event_stream() -> AsyncIterator[bytes]:
+    """The first page of tasks, then every change to tasks as it is committed"""
+    # Subscribe before reading the snapshot so no write falls in between
+    subscription = task_events.subscribe()
+    try:
+        async with AsyncReadSessionLocal() as db:
+            tasks, _ = await async_crud.get_tasks_page(db, limit=LIVE_INITIAL_TASKS)
+        html = templates.env.get_template("components/tasks.html").render(
+            tasks=tasks, list_id=LIST_ID, id_prefix=ITEM_ID_PREFIX
+        )
+        yield sse_message("tasks", html)
+
+        while True:
+            try:
+                batch = await subscription.get(timeout=LIVE_PING_INTERVAL)
+            except ConnectionAbortedError:
+                # Fell too far behind: end the stream and let the client
+                # reconnect from a fresh snapshot
+                return
+            yield batch_message(batch) if batch is not None else b": ping\n\n"
+    finally:
+        subscription.close()
+
+
+class EventStreamGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that leaves event streams alone. Gzip buffers output
+    until it has a full block, which would hold SSE messages back.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "text/event-stream" in Headers(scope=scope).get("accept", ""):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -1,14 +1,10 @@
 from fastapi import FastAPI, Request, HTTPException, Depends, Form, status
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse, RedirectResponse
 from pathlib import Path
-import uvicorn
+import math
 import os
 import logging
-import secrets
 from dotenv import load_dotenv
 
 # Configure logging
@@ -26,31 +22,39 @@ load_dotenv()
 
 # Import API router and auth
 from .api import router as api_router
-from .auth import require_auth, get_current_user, set_auth_cookie, clear_auth_cookie, AUTH_DISABLED
+from .auth import (
+    require_auth, get_current_user, authenticate, check_login_rate, set_token_cookie, LoginBusy,
+    clear_auth_cookie, revoke_auth_token,
+    AUTH_COOKIE_NAME, AUTH_DISABLED,
+)
 
 # Import database
 from .database.db import engine, init_db
+from .database.task_cache import TASK_CACHE_URL, MemoryCacheBackend, set_task_cache_backend
+from .fragment_cache import cached_response
+from .jobs import TASK_MAINTENANCE_INTERVAL, job_pool, schedule_job
+from .templating import templates, warm_templates
+from .static_assets import PrecompressedStaticFiles, build_static_assets, load_manifest
+from .metrics import METRICS_ENABLED, MetricsMiddleware, QueryTrackingMiddleware, render_metrics
+from .live import EventStreamGZipMiddleware
+from .server import default_workers, is_preloaded, run_workers
 
 # Create FastAPI application
 app_name = os.getenv("APP_NAME", "Oz Stack Starter Kit")
 app_version = os.getenv("APP_VERSION", "1.0.0")
 
-# Generate a secret key if not provided
-if not os.getenv("SECRET_KEY"):
-    logger.warning("SECRET_KEY not found in environment variables. Generating a random one for this session.")
-    logger.warning("For production, set a permanent SECRET_KEY in your .env file.")
-    os.environ["SECRET_KEY"] = secrets.token_hex(32)
-
 app = FastAPI(
     title=app_name,
     description="A lightweight web application starter kit with FastAPI, HTMX, and Tailwind CSS",
     version=app_version,
     docs_url="/api/docs" if os.getenv("DEBUG", "True").lower() == "true" else None,
     redoc_url="/api/redoc" if os.getenv("DEBUG", "True").lower() == "true" else None,
+    # orjson encodes responses several times faster than the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # Setup middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(EventStreamGZipMiddleware, minimum_size=1000)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, replace with specific origins
@@ -58,16 +62,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added late so it is outer and times everything, see metrics.py
+app.add_middleware(MetricsMiddleware)
+# Outermost: per-request query budgets, with or without metrics
+app.add_middleware(QueryTrackingMiddleware)
 
-# Setup static files and templates
+# Setup static files (templates are shared, see templating.py).
+# Fingerprinted builds of these files are served precompressed, see static_assets.py
 base_dir = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=base_dir / "static"), name="static")
-templates = Jinja2Templates(directory=base_dir / "templates")
+app.mount("/static", PrecompressedStaticFiles(directory=base_dir / "static"), name="static")
 
-# Include API router with authentication
-if not AUTH_DISABLED:
-    api_router.dependencies.append(Depends(require_auth))
-app.include_router(api_router)
+# Include API router with authentication. Dependencies must be passed here:
+# routes copy router.dependencies when they are declared, not when included.
+app.include_router(
+    api_router,
+    dependencies=[] if AUTH_DISABLED else [Depends(require_auth)]
+)
 
 # Define error handlers
 @app.exception_handler(404)
@@ -80,8 +90,10 @@ async def server_error_exception_handler(request: Request, exc: HTTPException):
     return templates.TemplateResponse("errors/500.html", {"request": request}, status_code=500)
 
 # Authentication routes
+# Plain def: token validation may query the revocation table, so these run
+# in the threadpool rather than blocking the event loop
 @app.get("/login")
-async def login_page(request: Request):
+def login_page(request: Request):
     """Render the login page"""
     # If authentication is disabled, redirect to home
     if AUTH_DISABLED:
@@ -100,9 +112,32 @@ async def login(request: Request, password: str = Form(...)):
     if AUTH_DISABLED:
         return RedirectResponse(url="/")
         
+    # Throttle per client IP before doing any (possibly expensive) hashing
+    retry_after = check_login_rate(request)
+    if retry_after:
+        logger.warning("Login attempt throttled")
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": f"Too many login attempts. Try again in {math.ceil(retry_after)} seconds."},
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+    
     response = RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
     
-    if set_auth_cookie(response, password):
+    try:
+        token = await authenticate(password)
+    except LoginBusy:
+        # Too many password checks pending across all clients
+        logger.warning("Login attempt rejected: password check backlog is full")
+        return templates.TemplateResponse(
+            "login.html",
+            {"request": request, "error": "The server is busy. Try again in a moment."},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"}
+        )
+    if token:
+        set_token_cookie(response, token)
         logger.info("User logged in successfully")
         return response
     else:
@@ -114,8 +149,12 @@ async def login(request: Request, password: str = Form(...)):
         )
 
 @app.get("/logout")
-async def logout():
-    """Log out the user by clearing the auth cookie"""
+def logout(request: Request):
+    """Log out the user by revoking the auth token and clearing the cookie"""
+    token = request.cookies.get(AUTH_COOKIE_NAME)
+    if token:
+        revoke_auth_token(token)
+    
     response = RedirectResponse(url="/login")
     clear_auth_cookie(response)
     return response
@@ -137,7 +176,11 @@ async def hello(request: Request, name: str = "World", authenticated: bool = Dep
     if not AUTH_DISABLED and not authenticated:
         return RedirectResponse(url="/login")
         
-    return templates.TemplateResponse("components/greeting.html", {"request": request, "name": name})
+    return await cached_response(
+        request,
+        ("components/greeting.html", name),
+        lambda: templates.TemplateResponse("components/greeting.html", {"request": request, "name": name})
+    )
 
 @app.get("/demo")
 async def demo(request: Request, authenticated: bool = Depends(get_current_user)):
@@ -158,9 +201,18 @@ async def health():
     """Health check endpoint (publicly accessible)"""
     return {"status": "ok", "version": app_version}
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics (publicly accessible, like /health)"""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Initialize database
 @app.on_event("startup")
 async def startup_db_client():
+    if is_preloaded():
+        # The multi-worker parent already did this once for every worker
+        return
     try:
         logger.info("Initializing database...")
         init_db()
@@ -168,11 +220,80 @@ async def startup_db_client():
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
 
+# Each worker only invalidates its own in-process task cache, so with several
+# workers it would serve other workers' stale writes; share one or go without
+@app.on_event("startup")
+async def startup_task_cache():
+    if is_preloaded() and not TASK_CACHE_URL:
+        set_task_cache_backend(MemoryCacheBackend(max_size=0))
+        logger.info("Task cache disabled in multi-worker mode; set TASK_CACHE_URL to share one")
+
+# Precompile templates so the first request doesn't pay for it
+@app.on_event("startup")
+async def startup_templates():
+    try:
+        warm_templates()
+    except Exception as e:
+        logger.error(f"Error precompiling templates: {str(e)}")
+
+# Fingerprint and precompress static assets in production
+@app.on_event("startup")
+async def startup_static_assets():
+    if os.getenv("DEBUG", "True").lower() == "true":
+        return
+    try:
+        if is_preloaded():
+            # The multi-worker parent built them; pick up its manifest
+            load_manifest()
+        else:
+            build_static_assets()
+    except Exception as e:
+        logger.error(f"Error building static assets: {str(e)}")
+
+# Run queued background jobs in every process (see jobs.py)
+@app.on_event("startup")
+async def startup_jobs():
+    try:
+        await job_pool.start()
+        # Archiving and incremental vacuum; the job queues its own next run
+        if TASK_MAINTENANCE_INTERVAL > 0:
+            await schedule_job("archive_tasks", TASK_MAINTENANCE_INTERVAL)
+    except Exception as e:
+        logger.error(f"Error starting job workers: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    await job_pool.stop()
+
 # Run the application
 if __name__ == "__main__":
-    host = os.getenv("HOST", "0.0.0.0")
-    port = int(os.getenv("PORT", 8000))
+    import argparse
+
     debug = os.getenv("DEBUG", "True").lower() == "true"
+    parser = argparse.ArgumentParser(description=f"Run {app_name}")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1 if debug else default_workers(),
+        help="Worker processes (default: 1 in debug mode, else WEB_CONCURRENCY or the CPU count)"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help=(
+            "Start the app once in a fresh process against a throwaway database and asset directory, "
+            "report import and startup hook times, and exit"
+        )
+    )
+    args = parser.parse_args()
+    if args.profile_startup:
+        from .startup_profile import profile_startup
+        print(profile_startup("src.main:app"))
+        raise SystemExit(0)
+    host = args.host
+    port = args.port
     
     # Log authentication status
     if AUTH_DISABLED:
@@ -191,15 +312,22 @@ if __name__ == "__main__":
             # Initialize the database
             init_db()
             
-            # Launch the desktop app
+            # Launch the desktop app; with DESKTOP_WEB_SERVER it also serves
+            # this app object, rather than a second copy of the module
             from .desktop.app import run_desktop_app
-            run_desktop_app()
+            run_desktop_app(web_app=app)
         except ImportError:
             logger.error("Desktop module not found. Make sure CustomTkinter is installed.")
         except Exception as e:
             logger.error(f"Error running desktop app: {str(e)}")
+    elif args.workers > 1 and not debug:
+        # One-time setup here, then N workers sharing the socket
+        run_workers("src.main:app", host, port, args.workers, log_level="warning")
     else:
+        if args.workers > 1:
+            logger.warning("Auto-reload (DEBUG=True) only supports a single worker. Ignoring --workers.")
         # Run the web server
+        import uvicorn
         uvicorn.run(
             "src.main:app", 
             host=host,
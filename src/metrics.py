@@ -0,0 +1,235 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import threading
+import time
+
+from .database.db import current_query_stats, track_queries
+from .database.task_cache import task_cache
+
+# Request metrics
+# MetricsMiddleware records per-route latency, response size, DB and template
+# time into in-process histograms (exposed as Prometheus text on /metrics) and
+# reports the same breakdown per response in a Server-Timing header.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._values: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, counts in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    bucket_labels = _format_labels(labels, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                bucket_labels = _format_labels(labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {counts[-2]}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {counts[-1]}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {counts[-2]}")
+        return lines
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status")
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route (time to first byte for event streams)"
+)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "HTTP response body size by route", SIZE_BUCKETS)
+DB_QUERIES = Counter("db_queries_total", "Database queries by route")
+DB_TIME = Histogram("http_request_db_seconds", "Database time per request by route")
+RENDER_TIME = Histogram("http_request_render_seconds", "Template render time per request by route")
+AUTH_TIME = Histogram("http_request_auth_seconds", "Auth check time per request by route")
+REGISTRY = [REQUESTS, IN_FLIGHT, LATENCY, RESPONSE_SIZE, DB_QUERIES, DB_TIME, RENDER_TIME, AUTH_TIME]
+
+
+def _task_cache_lines() -> List[str]:
+    """Counters kept by the task cache (see database/task_cache.py)"""
+    stats = task_cache.stats()
+    name = "task_cache_lookups_total"
+    lines = [f"# HELP {name} Task cache lookups by result", f"# TYPE {name} counter"]
+    lines.append(f'{name}{{result="hit"}} {stats["hits"]}')
+    lines.append(f'{name}{{result="miss"}} {stats["misses"]}')
+    name = "task_cache_invalidations_total"
+    lines += [f"# HELP {name} Task cache entries dropped by writes", f"# TYPE {name} counter"]
+    lines.append(f"{name} {stats['invalidations']}")
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_task_cache_lines())
+    return "\n".join(lines) + "\n"
+
+
+# Named timings (seconds) for the current request, e.g. {"render": 0.004}
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Add time spent in a named phase (auth, render, ...) to the current request"""
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def _route_label(scope: Scope) -> str:
+    """The route template (e.g. /api/tasks/bulk) rather than the raw path"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unknown")
+    if "endpoint" in scope:
+        # Mounted apps such as /static
+        return scope.get("root_path") or "mount"
+    return "unmatched"
+
+
+class QueryTrackingMiddleware:
+    """
+    Tracks each request's queries (budget and N+1 checks, see db.py).
+    Separate from MetricsMiddleware so the checks run with metrics off.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses pass straight through"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        # Started by QueryTrackingMiddleware, which wraps this one
+        queries = current_query_stats()
+        status_code = 500
+        size = 0
+        # Event streams stay open for minutes; time them until the headers
+        # are sent, or one connection would swamp the route's percentiles
+        first_byte: Optional[float] = None
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, size, first_byte
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                if headers.get("content-type", "").startswith("text/event-stream"):
+                    first_byte = time.perf_counter() - start
+                server_timing = [f"app;dur={(time.perf_counter() - start) * 1000:.2f}"]
+                if queries and queries.count:
+                    server_timing.append(
+                        f'db;dur={queries.duration * 1000:.2f};desc="{queries.count} queries"'
+                    )
+                server_timing.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+                headers.append("Server-Timing", ", ".join(server_timing))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            IN_FLIGHT.dec()
+            _timings.reset(token)
+            route = _route_label(scope)
+            method = scope["method"]
+            REQUESTS.inc(method=method, route=route, status=str(status_code))
+            duration = first_byte if first_byte is not None else time.perf_counter() - start
+            LATENCY.observe(duration, method=method, route=route)
+            RESPONSE_SIZE.observe(size, method=method, route=route)
+            if queries and queries.count:
+                DB_QUERIES.inc(queries.count, route=route)
+                DB_TIME.observe(queries.duration, route=route)
+            if "render" in timings:
+                RENDER_TIME.observe(timings["render"], route=route)
+            if "auth" in timings:
+                AUTH_TIME.observe(timings["auth"], route=route)
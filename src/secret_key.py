@@ -0,0 +1,62 @@
+from pathlib import Path
+import logging
+import os
+import secrets
+import time
+
+# Cookie signing key
+# Every worker process must sign and verify auth cookies with the same key.
+# SECRET_KEY from the environment always wins. Without it, a key is generated
+# once and persisted to SECRET_KEY_FILE, so all workers (and restarts) share it.
+
+logger = logging.getLogger("oz-stack.auth")
+
+SECRET_KEY_FILE = Path(os.getenv("SECRET_KEY_FILE", Path(__file__).parent.parent / ".secret_key"))
+
+
+def _read_key(path: Path) -> str:
+    return path.read_text().strip()
+
+
+def get_secret_key() -> str:
+    """
+    Return SECRET_KEY, or the persisted key, generating it on first use.
+    Safe to call from several processes at once: the first one to create the
+    file wins and the others read its key.
+    """
+    key = os.getenv("SECRET_KEY")
+    if key:
+        return key
+
+    try:
+        key = _read_key(SECRET_KEY_FILE)
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not read {SECRET_KEY_FILE}: {e}")
+
+    key = secrets.token_hex(32)
+    try:
+        SECRET_KEY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        # O_EXCL: exactly one process creates the file; 0600: owner-only
+        fd = os.open(SECRET_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another worker won the race; its key may still be being written
+        for _ in range(50):
+            existing = _read_key(SECRET_KEY_FILE)
+            if existing:
+                return existing
+            time.sleep(0.01)
+        raise RuntimeError(f"{SECRET_KEY_FILE} exists but is empty")
+    except OSError as e:
+        logger.warning("SECRET_KEY not found in environment variables. Generating a random one for this session.")
+        logger.warning(f"Could not persist it to {SECRET_KEY_FILE} ({e}), so other worker processes won't accept its cookies.")
+        return key
+
+    with os.fdopen(fd, "w") as f:
+        f.write(key)
+    logger.warning(f"SECRET_KEY not found in environment variables. Generated one and saved it to {SECRET_KEY_FILE}.")
+    logger.warning("For production, set a permanent SECRET_KEY in your .env file.")
+    return key
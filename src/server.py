@@ -0,0 +1,116 @@
+from typing import Any, Optional
+import logging
+import os
+import threading
+import time
+
+# Multi-worker web server
+# The parent process prepares everything that must happen exactly once
+# (signing key, database schema, static asset build), binds the socket and
+# then supervises N uvicorn worker processes sharing it:
+# - SIGHUP restarts the workers one at a time. Each replacement is started
+#   before the old worker is asked to shut down, and the old worker finishes
+#   its in-flight requests (up to GRACEFUL_TIMEOUT seconds) before exiting.
+# - Workers that die unexpectedly are replaced.
+# - SIGINT/SIGTERM shut every worker down gracefully.
+# uvicorn itself is only imported by run_workers; the supervisor lives in
+# supervisor.py.
+#
+# EmbeddedServer instead serves the app from a thread of the current process
+# (desktop mode), so the web UI and the desktop window share one database
+# engine and the same in-memory caches and task events.
+
+logger = logging.getLogger("oz-stack.server")
+
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# An embedded server stops with its window; don't wait long for open streams
+EMBEDDED_SHUTDOWN_TIMEOUT = float(os.getenv("EMBEDDED_SHUTDOWN_TIMEOUT", "3"))
+# Set in worker environments once the parent has run the one-time setup
+PRELOADED_ENV = "OZ_STACK_PRELOADED"
+
+
+def is_preloaded() -> bool:
+    """True inside workers whose parent already initialized the DB and assets"""
+    return os.getenv(PRELOADED_ENV, "False").lower() == "true"
+
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY if set, otherwise one worker per CPU"""
+    return int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+
+def prepare_workers() -> None:
+    """One-time setup in the parent, before any worker starts"""
+    from .database.db import init_db
+    from .secret_key import get_secret_key
+    from .static_assets import build_static_assets
+
+    # Workers inherit the environment, so they all sign with this key
+    os.environ["SECRET_KEY"] = get_secret_key()
+    init_db()
+    if os.getenv("DEBUG", "True").lower() != "true":
+        build_static_assets()
+    os.environ[PRELOADED_ENV] = "True"
+
+
+def run_workers(app: str, host: str, port: int, workers: int, log_level: Optional[str] = None) -> None:
+    """Serve the app from several worker processes sharing one socket"""
+    import uvicorn
+    from .supervisor import WorkerSupervisor
+
+    prepare_workers()
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        workers=workers,
+        log_level=log_level,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+    server = uvicorn.Server(config)
+    sock = config.bind_socket()
+    logger.info(f"Starting {workers} workers on {host}:{port} (SIGHUP restarts them gracefully)")
+    WorkerSupervisor(config, target=server.run, sockets=[sock]).run()
+
+
+class EmbeddedServer:
+    """uvicorn serving an app object from a background thread of this process"""
+
+    def __init__(self, app: Any, host: str = "127.0.0.1", port: int = 8000, log_level: str = "warning"):
+        import uvicorn
+
+        self.config = uvicorn.Config(
+            app,
+            host=host,
+            port=port,
+            log_level=log_level,
+            timeout_graceful_shutdown=EMBEDDED_SHUTDOWN_TIMEOUT,
+        )
+        self.server = uvicorn.Server(self.config)
+        # uvicorn skips signal handlers off the main thread; stop() ends it
+        self.thread = threading.Thread(target=self.server.run, name="embedded-server", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.config.host}:{self.config.port}"
+
+    def start(self, timeout: float = 15.0) -> str:
+        """Start serving and wait until the server accepts connections. Returns its URL."""
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive():
+                # uvicorn logs the reason, e.g. the port is already in use
+                raise RuntimeError(f"The web server could not start on {self.url}")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"The web server did not start on {self.url} within {timeout:.0f}s")
+            time.sleep(0.05)
+        logger.info(f"Serving the web UI on {self.url}")
+        return self.url
+
+    def stop(self) -> None:
+        """Finish in-flight requests (up to EMBEDDED_SHUTDOWN_TIMEOUT) and stop"""
+        self.server.should_exit = True
+        if self.thread.is_alive():
+            self.thread.join(EMBEDDED_SHUTDOWN_TIMEOUT + 2)
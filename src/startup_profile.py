@@ -0,0 +1,119 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Startup profiler (python -m src.main --profile-startup)
+# Starts the app the way a fresh worker would, in a new interpreter so every
+# import is cold: imports the app module under `python -X importtime`, then
+# runs each startup hook. Reports where the time went, with import time
+# attributed to the top-level package whose module code ran.
+#
+# The hooks have side effects (schema setup, asset build, job scheduling), so
+# the child runs against a throwaway database, asset build directory and
+# signing key file, and starts no job workers. The database is set up by an
+# earlier process, so init_db is timed the way a restart finds it: current.
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def _run_startup(app_path: str) -> None:
+    """Child process: import the app, run its startup hooks, print timings as JSON"""
+    module_name, _, attribute = app_path.partition(":")
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    app = getattr(module, attribute)
+    imported = time.perf_counter()
+
+    async def run_hooks() -> List[Tuple[str, float]]:
+        timings = []
+        for handler in app.router.on_startup:
+            hook_started = time.perf_counter()
+            result = handler()
+            if asyncio.iscoroutine(result):
+                await result
+            timings.append((handler.__name__, time.perf_counter() - hook_started))
+        # Stop what the hooks started (e.g. the job workers)
+        for handler in app.router.on_shutdown:
+            result = handler()
+            if asyncio.iscoroutine(result):
+                await result
+        return timings
+
+    hooks = asyncio.run(run_hooks())
+    print(json.dumps({"import": imported - started, "hooks": hooks}))
+
+
+def _import_time_by_package(importtime_output: str) -> Dict[str, float]:
+    """Sum the self time of every imported module per top-level package, in seconds"""
+    packages: Dict[str, float] = defaultdict(float)
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].strip()
+        packages[name.split(".")[0]] += int(fields[0]) / 1_000_000
+    return packages
+
+
+def _sandbox_env(directory: str) -> Dict[str, str]:
+    """The current environment, with everything the startup hooks write pointed into directory"""
+    env = os.environ.copy()
+    env["DATABASE_URL"] = f"sqlite:///{Path(directory) / 'startup.db'}"
+    env["STATIC_BUILD_DIR"] = str(Path(directory) / "static")
+    env["SECRET_KEY_FILE"] = str(Path(directory) / "secret_key")
+    env["JOB_WORKERS"] = "0"
+    return env
+
+
+def profile_startup(app_path: str = "src.main:app", top: int = 12) -> str:
+    """
+    Start the app in a fresh interpreter and return a startup time report.
+    Nothing outside a temporary directory is touched (see the module comment).
+    """
+    code = f"from src.startup_profile import _run_startup; _run_startup({app_path!r})"
+    with tempfile.TemporaryDirectory(prefix="startup-profile-") as directory:
+        env = _sandbox_env(directory)
+        subprocess.run(
+            [sys.executable, "-c", "from src.database.db import init_db; init_db()"],
+            cwd=ROOT_DIR, env=env, capture_output=True, check=True,
+        )
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Starting {app_path} failed:\n{result.stderr[-2000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    packages = _import_time_by_package(result.stderr)
+
+    lines = [f"Startup profile for {app_path}", ""]
+    lines.append(f"{'Import ' + app_path.partition(':')[0]:<40}{timings['import'] * 1000:>10.1f} ms")
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    for name, seconds in ranked[:top]:
+        lines.append(f"  {name:<38}{seconds * 1000:>10.1f} ms")
+    rest = sum(seconds for _, seconds in ranked[top:])
+    if rest:
+        lines.append(f"  {f'{len(ranked) - top} other packages':<38}{rest * 1000:>10.1f} ms")
+    hooks_total = sum(seconds for _, seconds in timings["hooks"])
+    lines.append(f"{'Startup hooks':<40}{hooks_total * 1000:>10.1f} ms")
+    for name, seconds in timings["hooks"]:
+        lines.append(f"  {name:<38}{seconds * 1000:>10.1f} ms")
+    lines.append("")
+    lines.append(f"{'Process start to ready (incl. interpreter)':<40}{elapsed * 1000:>10.1f} ms")
+    lines.append("Package times are self time under -X importtime, which inflates them somewhat.")
+    return "\n".join(lines)
@@ -0,0 +1,217 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Receive, Scope, Send
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import tempfile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only .gz variants are written without it
+    brotli = None
+
+# Fingerprinted, precompressed static assets
+# build_static_assets() copies every file under src/static to a content-hashed
+# name (css/output.css -> css/output.3f2a1b9c0d4e.css) in STATIC_BUILD_DIR and
+# writes .br/.gz variants next to it. static_url() maps logical paths to the
+# hashed URLs, and PrecompressedStaticFiles serves those files with the best
+# precompressed encoding and a long-lived immutable Cache-Control, so nothing
+# is compressed on the request path.
+
+logger = logging.getLogger("oz-stack.static")
+
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_BUILD_DIR = Path(os.getenv("STATIC_BUILD_DIR", Path(__file__).parent.parent / "build" / "static"))
+STATIC_URL_PREFIX = "/static"
+MANIFEST_NAME = "manifest.json"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml", ".ico"}
+# Preferred first
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+# Logical path (e.g. "css/output.css") -> fingerprinted path
+manifest: Dict[str, str] = {}
+
+
+def _fingerprint(relative_path: str, content: bytes) -> str:
+    """Insert a content hash before the file extension"""
+    digest = hashlib.blake2b(content, digest_size=6).hexdigest()
+    stem, suffix = os.path.splitext(relative_path)
+    return f"{stem}.{digest}{suffix}"
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Write a file so concurrent readers (or builders) never see a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def build_static_assets(
+    source_dir: Path = STATIC_DIR,
+    output_dir: Path = STATIC_BUILD_DIR
+) -> Dict[str, str]:
+    """
+    Write fingerprinted copies and .br/.gz variants of every static file.
+    Files that already exist are skipped, since their name is their content.
+    Returns the manifest, which is also saved as manifest.json.
+    """
+    built: Dict[str, str] = {}
+    for source in sorted(source_dir.rglob("*")):
+        if not source.is_file() or source.name.startswith("."):
+            continue
+        relative_path = source.relative_to(source_dir).as_posix()
+        content = source.read_bytes()
+        hashed_path = _fingerprint(relative_path, content)
+        built[relative_path] = hashed_path
+
+        target = output_dir / hashed_path
+        if not target.exists():
+            _write_atomic(target, content)
+        if source.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+
+        variants = {".gz": lambda: gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = lambda: brotli.compress(content, quality=11)
+        for suffix, compress in variants.items():
+            variant = target.with_name(target.name + suffix)
+            if variant.exists():
+                continue
+            compressed = compress()
+            # Only keep variants that are actually smaller
+            if len(compressed) < len(content):
+                _write_atomic(variant, compressed)
+
+    _write_atomic(output_dir / MANIFEST_NAME, json.dumps(built, indent=2, sort_keys=True).encode())
+    manifest.clear()
+    manifest.update(built)
+    logger.info(f"Built {len(built)} static assets in {output_dir}")
+    return built
+
+
+def load_manifest(output_dir: Path = STATIC_BUILD_DIR) -> Dict[str, str]:
+    """Load a manifest written by an earlier build, if there is one"""
+    try:
+        loaded = json.loads((output_dir / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, ValueError):
+        return manifest
+    manifest.clear()
+    manifest.update(loaded)
+    return manifest
+
+
+def static_url(path: str) -> str:
+    """
+    Template helper replacing url_for('static', path=...).
+    Returns the fingerprinted URL when the asset has been built, otherwise the
+    plain one (e.g. in development, where assets change on every edit).
+    """
+    path = path.lstrip("/")
+    return f"{STATIC_URL_PREFIX}/{manifest.get(path, path)}"
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """FileResponse that hands the file to the server via sendfile when it supports it"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.send_header_only or "http.response.zerocopysend" not in scope.get("extensions", {}):
+            await super().__call__(scope, receive, send)
+            return
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        with open(self.path, "rb") as file:
+            await send({"type": "http.response.zerocopysend", "file": file.fileno(), "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Parse Accept-Encoding, ignoring anything explicitly refused with q=0"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that also serves the fingerprinted build output.
+    Fingerprinted files are served precompressed (br, then gzip) when the
+    client accepts it, and are cacheable forever.
+    """
+
+    def __init__(self, *args, build_directory: Path = STATIC_BUILD_DIR, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The source directories alone, for paths the build output must not serve
+        self.source_files = StaticFiles(*args, **kwargs)
+        self.build_directory = os.path.realpath(build_directory)
+        # Look in the build output first, then the source directory
+        self.all_directories.insert(0, build_directory)
+
+    def _is_fingerprinted(self, full_path: str) -> bool:
+        return os.path.commonpath([full_path, self.build_directory]) == self.build_directory
+
+    def _is_build_internal(self, full_path: str) -> bool:
+        """The manifest and the .br/.gz variants, which are never served by their own name"""
+        if os.path.relpath(full_path, self.build_directory) == MANIFEST_NAME:
+            return True
+        return any(
+            full_path.endswith(suffix) and os.path.isfile(full_path[:-len(suffix)])
+            for _, suffix in ENCODINGS
+        )
+
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        full_path, stat_result = super().lookup_path(path)
+        if full_path and self._is_fingerprinted(full_path) and self._is_build_internal(full_path):
+            return self.source_files.lookup_path(path)
+        return full_path, stat_result
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        if not self._is_fingerprinted(full_path):
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        path: str = full_path
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted:
+                try:
+                    stat_result = os.stat(full_path + suffix)
+                except FileNotFoundError:
+                    continue
+                path = full_path + suffix
+                headers["Content-Encoding"] = encoding
+                break
+
+        response = ZeroCopyFileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+            stat_result=stat_result,
+            method=scope["method"],
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    build_static_assets()
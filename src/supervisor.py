@@ -0,0 +1,64 @@
+from uvicorn._subprocess import get_subprocess
+from uvicorn.supervisors.multiprocess import Multiprocess
+import logging
+import signal
+import time
+
+from .server import GRACEFUL_TIMEOUT
+
+# Worker process supervisor used by server.run_workers. Kept apart from
+# server.py so that importing the app doesn't load uvicorn's process manager.
+
+logger = logging.getLogger("oz-stack.server")
+
+
+class WorkerSupervisor(Multiprocess):
+    """uvicorn's process manager plus rolling restarts and worker replacement"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.restart_requested = False
+
+    def restart_handler(self, sig, frame) -> None:
+        self.restart_requested = True
+
+    def run(self) -> None:
+        self.startup()
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.restart_handler)
+        while not self.should_exit.wait(1.0):
+            if self.restart_requested:
+                self.restart_requested = False
+                self.restart_workers()
+            else:
+                self.replace_dead_workers()
+        self.shutdown()
+
+    def _spawn(self):
+        process = get_subprocess(
+            config=self.config, target=self.target, sockets=self.sockets
+        )
+        process.start()
+        return process
+
+    def restart_workers(self) -> None:
+        """Replace every worker, one at a time, without dropping requests"""
+        logger.info(f"Restarting {len(self.processes)} workers")
+        for index, old in enumerate(list(self.processes)):
+            if self.should_exit.is_set():
+                return
+            self.processes[index] = self._spawn()
+            old.terminate()
+            old.join(GRACEFUL_TIMEOUT + 5)
+            if old.is_alive():
+                old.kill()
+                old.join()
+        logger.info("All workers restarted")
+
+    def replace_dead_workers(self) -> None:
+        for index, process in enumerate(self.processes):
+            if not process.is_alive():
+                logger.warning(f"Worker {process.pid} exited with code {process.exitcode}; starting a replacement")
+                self.processes[index] = self._spawn()
+                # Don't spin if workers crash on startup
+                time.sleep(1.0)
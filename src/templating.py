@@ -0,0 +1,66 @@
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from pathlib import Path
+import logging
+import os
+import time
+
+from .database.search import highlight
+from .metrics import record_timing
+from .static_assets import static_url
+
+# Shared template environment
+# main.py and api.py render through this single Jinja2Templates instance, so
+# there is one environment and one template cache per process.
+
+logger = logging.getLogger("oz-stack.templates")
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+DEBUG = os.getenv("DEBUG", "True").lower() == "true"
+
+
+class TimedJinja2Templates(Jinja2Templates):
+    """Jinja2Templates that reports render time to the request metrics"""
+
+    def TemplateResponse(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().TemplateResponse(*args, **kwargs)
+        finally:
+            record_timing("render", time.perf_counter() - start)
+
+
+if DEBUG:
+    # Pick up template edits immediately during development
+    templates = TimedJinja2Templates(directory=TEMPLATES_DIR, auto_reload=True)
+else:
+    # In production templates never change underneath us: skip the stat() per
+    # render and keep compiled bytecode on disk so restarts skip compilation.
+    # TEMPLATE_CACHE_DIR defaults to a per-user directory in the system temp dir.
+    cache_dir = os.getenv("TEMPLATE_CACHE_DIR")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    templates = TimedJinja2Templates(
+        directory=TEMPLATES_DIR,
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(directory=cache_dir or None),
+    )
+
+# Fingerprinted static URLs: {{ static_url('css/output.css') }}
+templates.env.globals["static_url"] = static_url
+# Search snippets with <mark>ed matches: {{ result.snippet | highlight }}
+templates.env.filters["highlight"] = highlight
+
+
+def warm_templates() -> int:
+    """
+    Compile every .html template under src/templates into the environment cache.
+    Called at startup so the first request after a deploy doesn't pay for it.
+    Returns the number of templates compiled.
+    """
+    start = time.perf_counter()
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    logger.info(f"Compiled {len(names)} templates in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return len(names)
@@ -0,0 +1,79 @@
+"""
+Shared fixtures for the test suite
+
+The application reads its settings from the environment at import time, so
+they are set here, before anything from src is imported: a throwaway SQLite
+file and static build directory, no job workers, authentication off for the
+HTTP tests (the auth tests call src.auth directly) and
+QUERY_BUDGET_ACTION=raise, so a request that goes over its query budget or
+repeats a query N+1 style fails the test instead of logging a warning.
+"""
+
+import os
+import shutil
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="oz-tests-")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_DIR}/test.db",
+    "STATIC_BUILD_DIR": f"{TEST_DIR}/static",
+    "SECRET_KEY_FILE": f"{TEST_DIR}/.secret_key",
+    "SECRET_KEY": "test-secret-key",
+    "AUTH_DISABLED": "True",
+    "AUTH_PASSWORD": "test-password",
+    "JOB_WORKERS": "0",
+    "TASK_MAINTENANCE_INTERVAL": "0",
+    "QUERY_BUDGET_ACTION": "raise",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src import auth
+from src.database.db import SessionLocal, engine, init_db
+from src.database.task_cache import MemoryCacheBackend, set_task_cache_backend
+from src.database.version import bump_data_version
+
+# Tables emptied before every test; tasks first so its triggers keep the
+# status counters consistent
+TABLES = ("tasks", "tasks_archive", "jobs", "revoked_tokens")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_state(database):
+    with engine.begin() as connection:
+        for table in TABLES:
+            connection.execute(text(f"DELETE FROM {table}"))
+    set_task_cache_backend(MemoryCacheBackend())
+    bump_data_version()
+    with auth._token_lock:
+        auth._token_cache.clear()
+        auth._revoked_tokens.clear()
+    yield
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from src.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
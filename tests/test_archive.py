@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.database import crud, schemas
+from src.database.archive import archive_completed_tasks
+from src.database.db import engine
+from src.database.stats import check_task_stats
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def create_tasks(db, *tasks):
+    """Create tasks; those given is_completed=True are then completed"""
+    created = crud.bulk_create_tasks(
+        db, [schemas.TaskCreate(**{k: v for k, v in task.items() if k != "is_completed"}) for task in tasks]
+    )
+    completed = [row.id for row, task in zip(created, tasks) if task.get("is_completed")]
+    crud.bulk_update_tasks(db, [schemas.TaskBulkUpdate(id=task_id, is_completed=True) for task_id in completed])
+    return created
+
+
+def archive_all_completed(db):
+    return archive_completed_tasks(db, datetime.utcnow() + timedelta(days=1), batch_size=2)
+
+
+def test_archive_moves_completed_tasks(db):
+    created = create_tasks(
+        db,
+        {"name": "Open", "status": "Pending"},
+        *({"name": f"Done {i}", "status": "Completed", "is_completed": True} for i in range(5)),
+    )
+    assert archive_all_completed(db) == 5
+
+    assert [task.name for task in crud.get_tasks(db)] == ["Open"]
+    archived = crud.get_tasks(db, include_archived=True)
+    assert sorted(task.id for task in archived) == sorted(task.id for task in created)
+    assert crud.search_tasks(db, "Done") == []
+
+
+def test_counters_after_archiving(client, db):
+    create_tasks(
+        db,
+        {"name": "Open", "status": "Pending"},
+        {"name": "Started", "status": "In Progress"},
+        {"name": "Done 1", "status": "Completed", "is_completed": True},
+        {"name": "Done 2", "status": "Completed", "is_completed": True},
+    )
+    assert client.get("/api/tasks/stats").json()["total"] == 4
+    archive_all_completed(db)
+
+    stats = client.get("/api/tasks/stats").json()
+    assert stats == {
+        "total": 2,
+        "completed": 0,
+        "open": 2,
+        "by_status": {"Pending": 1, "In Progress": 1},
+    }
+    with engine.connect() as connection:
+        assert check_task_stats(connection) == {}
+
+
+def test_ids_are_not_reused_after_archiving_the_newest_task(db):
+    _, newest = create_tasks(
+        db,
+        {"name": "Old"},
+        {"name": "Newest", "status": "Completed", "is_completed": True},
+    )
+    archive_all_completed(db)
+    (replacement,) = create_tasks(db, {"name": "Replacement"})
+    assert replacement.id > newest.id
+
+    ids = [task.id for task in crud.get_tasks(db, include_archived=True)]
+    assert len(ids) == len(set(ids)) == 3
+
+
+def test_migrations_keep_ids_unique_and_triggers_in_place(tmp_path):
+    path = tmp_path / "migrated.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}", "PYTHONPATH": str(ROOT_DIR)}
+
+    def alembic(*args):
+        subprocess.run(
+            [sys.executable, "-m", "alembic", *args],
+            cwd=ROOT_DIR / "src" / "database", env=env, check=True, capture_output=True,
+        )
+
+    alembic("upgrade", "0007_task_archive")
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        "INSERT INTO tasks (name, status, is_completed) VALUES (?, ?, ?)",
+        [("One", "Pending", 0), ("Two", "Completed", 1), ("Three", "Completed", 1)],
+    )
+    # Archive the newest task the way archive.py does
+    connection.execute("INSERT INTO tasks_archive (id, name, status, is_completed) "
+                       "SELECT id, name, status, is_completed FROM tasks WHERE id = 3")
+    connection.execute("DELETE FROM tasks WHERE id = 3")
+    connection.commit()
+    connection.close()
+
+    alembic("upgrade", "head")
+    alembic("downgrade", "0007_task_archive")
+    alembic("upgrade", "head")
+
+    connection = sqlite3.connect(path)
+    connection.execute("INSERT INTO tasks (name, status) VALUES ('Four', 'Pending')")
+    new_id = connection.execute("SELECT id FROM tasks WHERE name = 'Four'").fetchone()[0]
+    assert new_id == 4
+
+    triggers = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert triggers == {
+        "tasks_fts_ai", "tasks_fts_ad", "tasks_fts_au",
+        "task_status_counts_ai", "task_status_counts_ad", "task_status_counts_au",
+    }
+    # The rebuilt table still feeds search and the counters
+    assert connection.execute("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'Four'").fetchall() == [(4,)]
+    assert connection.execute(
+        "SELECT total FROM task_status_counts WHERE status = 'Pending'"
+    ).fetchone() == (2,)
+    connection.close()
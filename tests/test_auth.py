@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import threading
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from src import auth, main
+from src.database import db as database
+from src.database.models import RevokedToken
+
+
+def forget_local_state():
+    """What another worker knows about tokens: nothing but the shared table"""
+    with auth._token_lock:
+        auth._token_cache.clear()
+        auth._revoked_tokens.clear()
+
+
+def test_valid_token_is_cached(monkeypatch):
+    token = auth._new_auth_token()
+    assert auth.validate_auth_token(token)
+    calls = []
+    monkeypatch.setattr(auth, "_revoked_elsewhere", lambda digest: calls.append(digest) or False)
+    assert auth.validate_auth_token(token)
+    assert calls == []
+
+
+def test_invalid_token_is_rejected():
+    assert not auth.validate_auth_token("not-a-token")
+
+
+def test_revoked_token_is_rejected_by_this_worker():
+    token = auth._new_auth_token()
+    assert auth.validate_auth_token(token)
+    auth.revoke_auth_token(token)
+    assert not auth.validate_auth_token(token)
+
+
+def test_revocation_reaches_other_workers(monkeypatch):
+    token = auth._new_auth_token()
+    assert auth.validate_auth_token(token)
+    # Another worker logs the token out
+    digest = auth._token_digest(token)
+    auth._store_revocation(digest, auth._load_auth_token(token), 0)
+
+    # Until the next revocation check the cached result stands...
+    assert auth.validate_auth_token(token)
+    # ...then the shared table is consulted
+    monkeypatch.setattr(auth, "AUTH_REVOCATION_CHECK_INTERVAL", 0)
+    assert not auth.validate_auth_token(token)
+
+
+def test_fresh_worker_rejects_revoked_token():
+    token = auth._new_auth_token()
+    auth.revoke_auth_token(token)
+    forget_local_state()
+    assert not auth.validate_auth_token(token)
+
+
+def test_revocation_check_fails_open(monkeypatch):
+    class BrokenEngine:
+        def connect(self):
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+
+    token = auth._new_auth_token()
+    monkeypatch.setattr(database, "read_engine", BrokenEngine())
+    assert auth.validate_auth_token(token)
+
+
+def test_logout_revokes_token_in_shared_table(client):
+    # Sync handlers run in the threadpool, so their DB calls don't block the loop
+    assert not inspect.iscoroutinefunction(main.logout)
+    assert not inspect.iscoroutinefunction(main.login_page)
+
+    token = auth._new_auth_token()
+    client.cookies.set(auth.AUTH_COOKIE_NAME, token)
+    try:
+        response = client.get("/logout", follow_redirects=False)
+    finally:
+        client.cookies.clear()
+    assert response.status_code == 307
+    assert response.headers["location"] == "/login"
+
+    with database.engine.connect() as connection:
+        stored = connection.execute(select(RevokedToken.digest)).scalars().all()
+    assert stored == [auth._token_digest(token)]
+    forget_local_state()
+    assert not auth.validate_auth_token(token)
+
+
+def test_login_rate_limit_per_key():
+    limiter = auth.TokenBucketLimiter(burst=2, rate=1)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert 0 < limiter.acquire("a") <= 1
+    assert limiter.acquire("b") == 0
+
+
+def test_password_check_backlog_is_bounded(monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_verify(plain_password, stored_hash=None):
+        started.set()
+        release.wait(5)
+        return plain_password == "right"
+
+    monkeypatch.setattr(auth, "verify_password", slow_verify)
+    monkeypatch.setattr(auth, "_hash_slots", threading.BoundedSemaphore(1))
+
+    async def scenario():
+        pending = asyncio.ensure_future(auth.verify_password_async("right", "stored-hash"))
+        await asyncio.to_thread(started.wait, 5)
+        # The only slot is taken: reject rather than queue
+        with pytest.raises(auth.LoginBusy):
+            await auth.verify_password_async("right", "stored-hash")
+        release.set()
+        assert await pending
+        # The slot was given back once the check ran
+        assert not await auth.verify_password_async("wrong", "stored-hash")
+
+    asyncio.run(scenario())
+
+
+def test_login_is_refused_when_busy_or_throttled(client, monkeypatch):
+    async def busy(password):
+        raise auth.LoginBusy("full")
+
+    monkeypatch.setattr(main, "AUTH_DISABLED", False)
+    monkeypatch.setattr(main, "authenticate", busy)
+    response = client.post("/login", data={"password": "x"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    monkeypatch.setattr(main, "check_login_rate", lambda request: 2.5)
+    response = client.post("/login", data={"password": "x"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
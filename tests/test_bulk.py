@@ -0,0 +1,63 @@
+from sqlalchemy import event
+
+from src.database import crud, schemas
+
+
+def count_commits(db):
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    return commits
+
+
+def test_iter_batches():
+    assert [list(batch) for batch in crud.iter_batches(range(7), 3)] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(crud.iter_batches([], 3)) == []
+
+
+def test_bulk_create_commits_once_per_batch(db):
+    commits = count_commits(db)
+    created = crud.bulk_create_tasks(db, [schemas.TaskCreate(name=f"Task {i}") for i in range(10)], batch_size=4)
+    assert len(commits) == 3
+    assert [task.name for task in created] == [f"Task {i}" for i in range(10)]
+    assert len({task.id for task in created}) == 10
+
+
+def test_bulk_update_groups_identical_changes(db):
+    ids = [task.id for task in crud.bulk_create_tasks(db, [schemas.TaskCreate(name=f"Task {i}") for i in range(6)])]
+    same = [schemas.TaskBulkUpdate(id=task_id, status="Completed") for task_id in ids[:5]]
+    assert len(crud.task_bulk_update_statements(same)) == 1
+
+    # Repeated ids are merged in order, so the last value wins
+    updates = same + [schemas.TaskBulkUpdate(id=ids[0], status="In Progress")]
+    commits = count_commits(db)
+    updated = crud.bulk_update_tasks(db, updates, batch_size=100)
+    assert len(commits) == 1
+    statuses = {task.id: task.status for task in crud.get_tasks(db)}
+    assert statuses[ids[0]] == "In Progress"
+    assert [statuses[task_id] for task_id in ids[1:5]] == ["Completed"] * 4
+    assert statuses[ids[5]] == "Pending"
+    assert {task.id for task in updated} == set(ids[:5])
+
+
+def test_bulk_update_skips_missing_ids(db):
+    (task,) = crud.bulk_create_tasks(db, [schemas.TaskCreate(name="Task")])
+    updated = crud.bulk_update_tasks(db, [
+        schemas.TaskBulkUpdate(id=task.id, name="Renamed"),
+        schemas.TaskBulkUpdate(id=task.id + 1000, name="Missing"),
+    ])
+    assert [row.name for row in updated] == ["Renamed"]
+
+
+def test_bulk_delete_returns_deleted_ids(db):
+    ids = [task.id for task in crud.bulk_create_tasks(db, [schemas.TaskCreate(name=f"Task {i}") for i in range(5)])]
+    commits = count_commits(db)
+    deleted = crud.bulk_delete_tasks(db, ids[:3] + [ids[-1] + 1000], batch_size=2)
+    assert len(commits) == 2
+    assert sorted(deleted) == ids[:3]
+    assert [task.id for task in crud.get_tasks(db)] == ids[3:]
+
+
+def test_bulk_create_route_validates_every_item(client):
+    response = client.post("/api/tasks/bulk", json=[{"name": "Fine"}, {"name": ""}])
+    assert response.status_code == 422
+    assert client.get("/api/tasks/page").json()["tasks"] == []
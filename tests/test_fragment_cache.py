@@ -0,0 +1,55 @@
+import pytest
+
+from src import api
+from src.fragment_cache import etag_matches, make_etag
+
+ETAG = make_etag(b"body")
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    (ETAG, True),
+    (f"W/{ETAG}", True),
+    (f'"other", {ETAG}', True),
+    ('"other"', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, ETAG) is matches
+
+
+@pytest.mark.parametrize("url", ["/api/tasks/stats", "/api/tasks/stats/html", "/api/tasks/search/html?q=task"])
+def test_unchanged_data_is_not_modified(client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"]
+
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+
+def test_write_invalidates_the_cached_fragment(client):
+    first = client.get("/api/tasks/stats/html")
+    assert client.post("/api/tasks/bulk", json=[{"name": "Task"}]).status_code == 201
+
+    after_write = client.get("/api/tasks/stats/html", headers={"If-None-Match": first.headers["ETag"]})
+    assert after_write.status_code == 200
+    assert after_write.headers["ETag"] != first.headers["ETag"]
+
+
+def test_cached_fragment_is_rendered_once(client, monkeypatch):
+    calls = []
+    task_stats = api.async_crud.get_task_stats
+
+    async def counting(db):
+        calls.append(1)
+        return await task_stats(db)
+
+    monkeypatch.setattr(api.async_crud, "get_task_stats", counting)
+    for _ in range(3):
+        assert client.get("/api/tasks/stats/html").status_code == 200
+    assert len(calls) == 1
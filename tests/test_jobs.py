@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from src import jobs
+from src.database import models, schemas
+from src.database.db import AsyncSessionLocal, async_engine
+
+
+@pytest.fixture(autouse=True)
+def handlers(monkeypatch):
+    monkeypatch.setitem(jobs._handlers, "test_echo", lambda ctx, value=None: {"value": value, "attempt": ctx.attempt})
+
+
+def run(coroutine):
+    """Run a coroutine on a fresh loop; pooled async connections don't outlive it"""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(main())
+
+
+def enqueue(db, **kwargs):
+    return jobs.enqueue_job_sync(db, schemas.JobCreate(kind="test_echo", **kwargs)).id
+
+
+def load(db, job_id):
+    db.expire_all()
+    return db.get(models.Job, job_id)
+
+
+def test_unknown_kind_is_rejected(db):
+    with pytest.raises(ValueError, match="Unknown job kind"):
+        jobs.enqueue_job_sync(db, schemas.JobCreate(kind="no_such_kind"))
+
+
+def test_held_lease_is_not_claimed_again(db):
+    job_id = enqueue(db)
+
+    async def scenario():
+        first = await jobs.claim_job("worker-a", lease_seconds=30)
+        second = await jobs.claim_job("worker-b", lease_seconds=30)
+        return first, second
+
+    first, second = run(scenario())
+    assert first.id == job_id
+    assert second is None
+
+
+def test_expired_lease_is_reclaimed(db):
+    job_id = enqueue(db)
+
+    async def scenario():
+        # worker-a stops responding: its lease is already over
+        first = await jobs.claim_job("worker-a", lease_seconds=-1)
+        second = await jobs.claim_job("worker-b", lease_seconds=30)
+        renewed_by_a = await jobs.renew_lease("worker-a", job_id, 30)
+        finished_by_a = await jobs.finish_job("worker-a", job_id, status=jobs.SUCCEEDED)
+        finished_by_b = await jobs.finish_job("worker-b", job_id, status=jobs.SUCCEEDED)
+        return first, second, renewed_by_a, finished_by_a, finished_by_b
+
+    first, second, renewed_by_a, finished_by_a, finished_by_b = run(scenario())
+    assert first.id == second.id == job_id
+    assert (first.attempts, second.attempts) == (1, 2)
+    # The old owner can no longer touch the job
+    assert not renewed_by_a
+    assert not finished_by_a
+    assert finished_by_b
+
+    job = load(db, job_id)
+    assert job.status == jobs.SUCCEEDED
+    assert job.lease_owner is None and job.finished_at is not None
+
+
+def test_job_whose_lease_expired_on_every_attempt_fails(db):
+    job_id = enqueue(db, max_attempts=2)
+    pool = jobs.JobWorkerPool(concurrency=0)
+
+    async def scenario():
+        await jobs.claim_job("worker-a", lease_seconds=-1)
+        await jobs.claim_job("worker-a", lease_seconds=-1)
+        last = await jobs.claim_job(pool.name, lease_seconds=30)
+        await pool._run(pool.name, last)
+
+    run(scenario())
+    job = load(db, job_id)
+    assert job.status == jobs.FAILED
+    assert job.error == "The worker stopped responding on every attempt"
+
+
+def test_worker_pool_runs_queued_jobs(db):
+    job_id = enqueue(db, payload={"value": 42})
+    pool = jobs.JobWorkerPool(concurrency=1, poll_interval=0.05)
+
+    async def scenario():
+        await pool.start()
+        try:
+            for _ in range(100):
+                async with AsyncSessionLocal() as session:
+                    job = await jobs.get_job(session, job_id)
+                if job.status in jobs.FINISHED:
+                    return
+                await asyncio.sleep(0.05)
+        finally:
+            await pool.stop()
+
+    run(scenario())
+    job = load(db, job_id)
+    assert job.status == jobs.SUCCEEDED
+    assert job.result == '{"value": 42, "attempt": 1}'
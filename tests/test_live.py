@@ -0,0 +1,54 @@
+import asyncio
+
+from src import live
+from src.database import crud, schemas
+from src.database.events import task_events
+
+
+def read_updates(subscribers, write):
+    """Open live streams, run write in a thread, return each stream's next message"""
+    async def scenario():
+        streams = [live.task_event_stream() for _ in range(subscribers)]
+        try:
+            for stream in streams:
+                assert (await stream.__anext__()).startswith(b"event: tasks\n")
+            await asyncio.to_thread(write)
+            return [await asyncio.wait_for(stream.__anext__(), 5) for stream in streams]
+        finally:
+            for stream in streams:
+                await stream.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_each_batch_is_rendered_once_for_all_subscribers(db, monkeypatch):
+    calls = []
+
+    def counting(events):
+        calls.append(events)
+        return live.render_events(events)
+
+    monkeypatch.setattr(task_events, "renderer", counting)
+    messages = read_updates(3, lambda: crud.create_task(db, schemas.TaskCreate(name="<b>New</b>")))
+
+    assert len(calls) == 1
+    assert len(set(messages)) == 1
+    assert messages[0].startswith(b"event: task\n")
+    assert b"&lt;b&gt;New&lt;/b&gt;" in messages[0]
+    assert not task_events.has_subscribers
+
+
+def test_subscribers_render_when_publishing_failed(db, monkeypatch):
+    def broken(events):
+        raise RuntimeError("template error")
+
+    monkeypatch.setattr(task_events, "renderer", broken)
+    messages = read_updates(2, lambda: crud.create_task(db, schemas.TaskCreate(name="Fallback")))
+    assert all(b"Fallback" in message for message in messages)
+
+
+def test_nothing_is_rendered_without_subscribers(db, monkeypatch):
+    calls = []
+    monkeypatch.setattr(task_events, "renderer", calls.append)
+    crud.create_task(db, schemas.TaskCreate(name="Unseen"))
+    assert calls == []
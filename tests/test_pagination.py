@@ -0,0 +1,53 @@
+import base64
+
+import pytest
+
+from src.database import crud, schemas
+
+
+def b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def test_pages_cover_every_task_once(client, db):
+    created = crud.bulk_create_tasks(db, [schemas.TaskCreate(name=f"Task {i}") for i in range(25)])
+
+    ids, after = [], None
+    for _ in range(3):
+        params = {"limit": 10, **({"after": after} if after else {})}
+        response = client.get("/api/tasks/page", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        ids.extend(task["id"] for task in page["tasks"])
+        after = page["next_cursor"]
+    assert after is None
+    assert ids == [task.id for task in created]
+
+
+def test_status_filter_applies_to_every_page(client, db):
+    crud.bulk_create_tasks(db, [
+        schemas.TaskCreate(name=f"Task {i}", status="Pending" if i % 2 else "In Progress") for i in range(10)
+    ])
+    first = client.get("/api/tasks/page", params={"limit": 3, "status": "Pending"}).json()
+    second = client.get(
+        "/api/tasks/page", params={"limit": 3, "status": "Pending", "after": first["next_cursor"]}
+    ).json()
+    statuses = {task["status"] for task in first["tasks"] + second["tasks"]}
+    assert statuses == {"Pending"}
+    assert len(first["tasks"]) + len(second["tasks"]) == 5
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    "%%%",
+    b64("not json"),
+    b64("null"),
+    b64('{"a": 1}'),
+    b64('["2024-01-01", "x"]'),
+    b64('["2024-01-01", [1]]'),
+    b64('["2024-01-01", 1, 2]'),
+])
+def test_malformed_cursor_is_a_bad_request(client, cursor):
+    response = client.get("/api/tasks/page", params={"after": cursor})
+    assert response.status_code == 400
+    assert "Invalid pagination cursor" in response.json()["detail"]
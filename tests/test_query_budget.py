@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import text
+
+from src.database import crud
+from src.database import db as database
+from src.database.db import QueryBudgetExceeded, engine, track_queries
+
+
+def test_running_over_the_budget_raises():
+    with engine.connect() as connection, track_queries("test", budget=2):
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+        with pytest.raises(QueryBudgetExceeded, match="Query budget of 2 exceeded in test"):
+            connection.execute(text("SELECT 3"))
+
+
+def test_repeated_select_raises_as_n_plus_one():
+    with engine.connect() as connection, track_queries("test", budget=0):
+        with pytest.raises(QueryBudgetExceeded, match="Possible N\\+1"):
+            for task_id in range(database.N_PLUS_ONE_THRESHOLD):
+                connection.execute(text("SELECT id FROM tasks WHERE id = :id"), {"id": task_id})
+
+
+def test_tracking_is_restored_after_the_block():
+    with track_queries("outer") as outer:
+        with track_queries("inner") as inner:
+            assert database.current_query_stats() is inner
+        assert database.current_query_stats() is outer
+    assert database.current_query_stats() is None
+
+
+def test_bulk_routes_are_exempt_from_the_budget(client, monkeypatch):
+    # Two rows per statement and commit: far more statements than the budget
+    monkeypatch.setattr(crud, "BULK_BATCH_SIZE", 2)
+    count = 300
+    assert count // 2 > database.QUERY_BUDGET
+
+    response = client.post("/api/tasks/bulk", json=[{"name": f"Task {i}"} for i in range(count)])
+    assert response.status_code == 201
+    ids = [task["id"] for task in response.json()]
+    assert len(ids) == count
+
+    response = client.patch(
+        "/api/tasks/bulk", json=[{"id": task_id, "name": f"Renamed {task_id}"} for task_id in ids]
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == count
+
+    response = client.request("DELETE", "/api/tasks/bulk", json={"task_ids": ids})
+    assert response.status_code == 200
+    assert sorted(response.json()["deleted"]) == sorted(ids)
@@ -0,0 +1,66 @@
+import pytest
+
+from src.database import crud, schemas
+from src.database.search import fts_query, highlight
+
+
+@pytest.fixture
+def tasks(db):
+    return crud.bulk_create_tasks(db, [
+        schemas.TaskCreate(name="Fix login", description="The form rejects 100% of passwords"),
+        schemas.TaskCreate(name="Write docs", description="Mention the login fix", status="In Progress"),
+        schemas.TaskCreate(name="Unrelated", description="Nothing to see"),
+    ])
+
+
+def test_fts_query_ignores_operators():
+    assert fts_query('fix lo"gin* OR') == '"fix"* "lo"* "gin"* "OR"*'
+    assert fts_query("  ") == ""
+
+
+def test_highlight_escapes_before_marking():
+    assert highlight("<b>\x02fix\x03</b>") == "&lt;b&gt;<mark>fix</mark>&lt;/b&gt;"
+
+
+def test_every_word_must_match_as_a_prefix(db, tasks):
+    results = crud.search_tasks(db, "fix log")
+    # The name match ranks first
+    assert [task.name for task, _, _ in results] == ["Fix login", "Write docs"]
+    assert crud.search_tasks(db, "fix nothing") == []
+    assert crud.search_tasks(db, "?!") == []
+
+
+def test_status_filter(db, tasks):
+    results = crud.search_tasks(db, "login", filters={"status": "In Progress"})
+    assert [task.name for task, _, _ in results] == ["Write docs"]
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("FIX login", ["Fix login", "Write docs"]),
+    ("docs", ["Write docs"]),
+    ("100", ["Fix login"]),
+    ("fix nothing", []),
+])
+def test_substring_fallback_off_sqlite(db, tasks, search, expected):
+    rows = db.execute(crud.task_search_statement(search, dialect_name="postgresql")).all()
+    assert [task.name for task, _, _ in rows] == expected
+
+
+def test_substring_fallback_escapes_wildcards(db, tasks):
+    crud.bulk_create_tasks(db, [schemas.TaskCreate(name="snake_case")])
+    rows = db.execute(crud.task_search_statement("snake_case", dialect_name="postgresql")).all()
+    assert [task.name for task, _, _ in rows] == ["snake_case"]
+    # "_" is not a wildcard: "snakeXcase" must not match
+    crud.bulk_create_tasks(db, [schemas.TaskCreate(name="snakeXcase")])
+    rows = db.execute(crud.task_search_statement("snake_case", dialect_name="postgresql")).all()
+    assert [task.name for task, _, _ in rows] == ["snake_case"]
+
+
+def test_search_routes(client, tasks):
+    hits = client.get("/api/tasks/search", params={"q": "login"}).json()
+    assert [hit["name"] for hit in hits] == ["Fix login", "Write docs"]
+    assert "<mark>" in hits[0]["snippet"]
+
+    response = client.get("/api/tasks/search/html", params={"q": "docs"})
+    assert response.status_code == 200
+    assert "Write docs" in response.text
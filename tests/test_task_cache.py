@@ -0,0 +1,67 @@
+import pytest
+
+from src.database import crud, schemas, task_cache
+from src.database.task_cache import CacheBackend, MemoryCacheBackend, TaskCache
+
+
+def test_backend_missing_a_method_cannot_be_created():
+    class NoDelete(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ex=None):
+            return True
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
+
+
+def test_any_object_with_the_redis_methods_is_a_backend():
+    class RedisLike:
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ex=None):
+            return True
+
+        def delete(self, *keys):
+            return 0
+
+    assert isinstance(RedisLike(), CacheBackend)
+    with pytest.raises(TypeError):
+        task_cache.set_task_cache_backend(object())
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_size=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == (b"1", None, b"3")
+    assert backend.delete("a", "b") == 1
+
+
+def test_load_that_raced_with_a_write_is_not_stored():
+    cache = TaskCache(MemoryCacheBackend())
+    generation = cache.generation
+    cache.invalidate([1])
+    assert not cache.set(1, b"stale", generation)
+    assert cache.get(1) is None
+
+
+def test_reads_are_cached_until_the_task_changes(client, db):
+    (task,) = crud.bulk_create_tasks(db, [schemas.TaskCreate(name="Before")])
+    cache = task_cache.task_cache
+    cache.reset_stats()
+
+    assert client.get(f"/api/tasks/{task.id}").json()["name"] == "Before"
+    assert client.get(f"/api/tasks/{task.id}").json()["name"] == "Before"
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    crud.bulk_update_tasks(db, [schemas.TaskBulkUpdate(id=task.id, name="After")])
+    assert cache.backend.get(cache.key(task.id)) is None
+    assert client.get(f"/api/tasks/{task.id}").json()["name"] == "After"
+
+    crud.bulk_delete_tasks(db, [task.id])
+    assert client.get(f"/api/tasks/{task.id}").status_code == 404